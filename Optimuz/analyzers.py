@@ -0,0 +1,81 @@
+"""OPTIMUZ analyzers - emotion, wake word, fact keywords and name in one regex pass"""
+
+import re
+from collections import namedtuple
+
+# order = priority when several emotions match
+EMOTIONS = {
+    "sad":       ["sad","depressed","crying","hurt","lonely","heartbreak"],
+    "anxious":   ["anxious","worried","stressed","panic","scared","overwhelmed"],
+    "happy":     ["happy","great","amazing","excited","love","awesome","wonderful"],
+    "angry":     ["angry","frustrated","annoyed","mad","furious"],
+    "tired":     ["tired","exhausted","sleepy","drained"],
+    "motivated": ["motivated","ready","focused","let's go","pumped"],
+}
+FACT_KEYWORDS  = ["i like","i love","i work","i live","my job","i study","i am","i enjoy","my goal"]
+WAKE_GREETINGS = ["hey","hi","ok","okay","hello","yo"]
+WAKE_NAME      = r"opti(?:muz)?"
+NAME_TRIGGERS  = ["my name is","i'm","i am","call me"]
+
+Analysis = namedtuple("Analysis", "emotion wake clean facts name")
+
+def trie_pattern(words):
+    """Regex alternation with shared prefixes factored out, e.g. i (?:am|like)."""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w: node = node.setdefault(ch, {})
+        node[""] = {}
+    def build(node):
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts: return ""
+        if len(alts) == 1 and "" not in node: return alts[0]
+        return "(?:" + "|".join(alts) + ")" + ("?" if "" in node else "")
+    return build(trie)
+
+class TextAnalyzer:
+    """Scans an utterance once with a single compiled regex. A lookahead
+    visits every position where a keyword, wake phrase or name trigger
+    starts, so overlapping hits ("i love" / "love") are all seen. Keywords
+    are substrings, as before: "love" also counts inside "lovely"."""
+
+    def __init__(self, emotions=EMOTIONS, facts=FACT_KEYWORDS, wake_greetings=WAKE_GREETINGS,
+                 wake_name=WAKE_NAME, name_triggers=NAME_TRIGGERS):
+        self.emotions = list(emotions)
+        tags = {}                                # keyword -> {"sad", "fact", ...}
+        for emo, kws in emotions.items():
+            for kw in kws: tags.setdefault(kw.lower(), set()).add(emo)
+        for kw in facts: tags.setdefault(kw.lower(), set()).add("fact")
+        # the regex reports the longest keyword at a position; fold in the shorter ones it hides
+        self.tags = {k: sorted((t, p) for p in tags if k.startswith(p) for t in tags[p]) for k in tags}
+        kw   = trie_pattern(tags)
+        wake = r"(?:%s)\s+%s" % (trie_pattern(wake_greetings), wake_name)
+        name = r"(?:%s)\s+(?P<given>[a-z]{2,})" % trie_pattern(name_triggers)
+        scan = r"(?=(?P<wake>%s)|(?P<name>%s)|(?P<kw>%s))" % (wake, name, kw)
+        self.scan    = re.compile(scan)              # runs on lowercased text; re.I is ~2x slower
+        self.scan_i  = re.compile(scan, re.I)
+        self.kw_re   = re.compile(kw, re.I)
+        # clean strips the first greeting (in list order) that matched, every occurrence, as before
+        self.wake_res = [re.compile(r"%s\s+%s" % (re.escape(g), wake_name), re.I) for g in wake_greetings]
+
+    def analyze(self, text):
+        low, scan = text.lower(), self.scan
+        if len(low) != len(text): low, scan = text, self.scan_i   # lowercasing moved offsets
+        found, facts, wake, name = set(), [], False, None
+        for m in scan.finditer(low):
+            kw = m.group("kw")
+            if kw is None:
+                if m.group("wake"): wake = True
+                elif name is None: name = text[m.start("given"):m.end("given")]
+                hidden = self.kw_re.match(low, m.start())
+                if not hidden: continue
+                kw = hidden.group()
+            for tag, k in self.tags[kw.lower()]:
+                if tag != "fact": found.add(tag)
+                elif k not in facts: facts.append(k)
+        emotion = next((e for e in self.emotions if e in found), "neutral")
+        clean = text
+        if wake:
+            low = low.lower()
+            clean = next(r.sub("", low) for r in self.wake_res if r.search(low)).strip(" .,!?")
+        return Analysis(emotion, wake, clean, facts, name)
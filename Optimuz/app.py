@@ -1,22 +1,80 @@
 """OPTIMUZ v2 - AI Voice Companion"""
 
-import os, json, base64, re, tempfile, asyncio
+import os, time, uuid
 from pathlib import Path
-from datetime import datetime
 import streamlit as st
 from dotenv import load_dotenv
+from backends import make_backends
+from pipeline import mp3_seconds
+from cache import AudioCache, CachedTTS, ReplyCache
+from services import Services
+from tracing import Tracer
+from companion import CompanionPool
+from storage import seed_user_dir
+from render import CSS, LOG_HEAD, OrbView, chat_html
 
 load_dotenv()
+st.set_page_config(page_title="OPTIMUZ", page_icon="🤖", layout="centered", initial_sidebar_state="collapsed")   # older Streamlit: must be the first st call
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 EDGE_VOICE   = os.getenv("EDGE_VOICE", "en-US-ChristopherNeural")
+BACKEND      = os.getenv("OPTIMUZ_BACKEND", "groq")          # "fake" = offline stand-ins
+STREAMING    = os.getenv("OPTIMUZ_STREAMING", "1") == "1"    # speak sentence by sentence
+TTS_CACHE_MB = int(os.getenv("TTS_CACHE_MB", "64"))
+PROMPT_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+FACTS_MAX    = int(os.getenv("FACTS_MAX", "2000"))   # older facts are reached through the recall index
+MULTI_USER   = os.getenv("OPTIMUZ_MULTI_USER", "0") == "1"   # one namespace per browser session
+FIXED_USER   = os.getenv("OPTIMUZ_USER", "default")   # the namespace used when MULTI_USER is off
+MAX_OPEN_USERS = int(os.getenv("MAX_OPEN_USERS", "64"))
+RECALL_MB    = float(os.getenv("RECALL_MB", "2"))     # history read into each user's recall index on load
+SEGMENT_MB   = float(os.getenv("HISTORY_SEGMENT_MB", "4"))
+SEGMENT_DAYS = float(os.getenv("HISTORY_SEGMENT_DAYS", "7"))
+KEEP_DAYS    = float(os.getenv("HISTORY_KEEP_DAYS", "0"))   # 0 = keep archives forever
+REPLY_CACHE  = os.getenv("REPLY_CACHE", "0") == "1"    # answer repeated short utterances from cache
+REPLY_TTL_H  = float(os.getenv("REPLY_CACHE_TTL_H", "6"))
+CHAT_KEEP    = 32                                     # messages kept in session state (16 are shown)
 
 DATA_DIR     = Path("data")
-MEMORY_FILE  = DATA_DIR / "memory.json"
-HISTORY_FILE = DATA_DIR / "history.jsonl"
 DATA_DIR.mkdir(exist_ok=True)
 
-st.set_page_config(page_title="OPTIMUZ", page_icon="🤖", layout="centered", initial_sidebar_state="collapsed")
+@st.cache_resource
+def tracer(): return Tracer(DATA_DIR / "metrics.jsonl")
+
+TRACER       = tracer()
+
+@st.cache_resource
+def tts_cache(): return AudioCache(DATA_DIR / "tts_cache", TTS_CACHE_MB << 20)
+
+@st.cache_resource
+def services():
+    stt, llm, tts = make_backends(BACKEND, GROQ_API_KEY, EDGE_VOICE)
+    return Services(stt, llm, CachedTTS(tts, tts_cache()))
+
+SVC = services()
+
+@st.cache_resource
+def reply_cache(): return ReplyCache(ttl=REPLY_TTL_H * 3600) if REPLY_CACHE else None
+
+@st.cache_resource
+def companions():
+    seed_user_dir(DATA_DIR, FIXED_USER)                # data/memory.json + history.jsonl from before per-user dirs
+    return CompanionPool(DATA_DIR, SVC, TRACER, MAX_OPEN_USERS, replies=reply_cache(), prompt_budget=PROMPT_BUDGET,
+                         facts_max=FACTS_MAX, recall_bytes=int(RECALL_MB * (1 << 20)),
+                         segment_bytes=int(SEGMENT_MB * (1 << 20)), segment_days=SEGMENT_DAYS, keep_days=KEEP_DAYS)
+
+def session_user():
+    """OPTIMUZ_USER, unless OPTIMUZ_MULTI_USER=1: then ?user=<id> if given, else
+    a new id put in the URL so a reload keeps it."""
+    user = st.query_params.get("user") if MULTI_USER else FIXED_USER
+    if not user:
+        user = st.session_state.get("user") or uuid.uuid4().hex[:12]
+        st.query_params["user"] = user
+    if st.session_state.get("user") != user:      # new session or switched user: drop the old user's state
+        for k in ("messages","memory","total","prompt_stats","vad"): st.session_state.pop(k, None)
+        st.session_state.user = user
+    return user
+
+OPTIMUZ = companions().get(session_user())
 
 # ── CSS ───────────────────────────────────────────────────────────────────────
 st.markdown("""<style>
@@ -57,244 +115,44 @@ div[data-testid="stAudioInput"]{
 }
 .msg-anim{animation:fadeUp 0.35s ease-out forwards}
 </style>""", unsafe_allow_html=True)
-
-# ── Helpers ───────────────────────────────────────────────────────────────────
-def load_memory():
-    if MEMORY_FILE.exists():
-        try: return json.loads(MEMORY_FILE.read_text())
-        except: pass
-    return {"facts":[],"name":None,"last_seen":None,"mood_history":[]}
-
-def save_memory(m): MEMORY_FILE.write_text(json.dumps(m, indent=2, ensure_ascii=False))
-
-def append_history(role, content, emotion="neutral"):
-    with open(HISTORY_FILE,"a",encoding="utf-8") as f:
-        f.write(json.dumps({"ts":datetime.now().isoformat(),"role":role,"content":content,"emotion":emotion},ensure_ascii=False)+"\n")
-
-def load_recent_history(n=16):
-    if not HISTORY_FILE.exists(): return []
-    lines = HISTORY_FILE.read_text(encoding="utf-8").strip().split("\n")
-    return [json.loads(l) for l in lines[-n:] if l.strip()]
-
-def update_memory(text, emotion="neutral"):
-    m = load_memory()
-    m["last_seen"] = datetime.now().isoformat()
-    match = re.search(r"(?:my name is|i'm|i am|call me)\s+([A-Z][a-z]+)", text, re.IGNORECASE)
-    if match and not m.get("name"): m["name"] = match.group(1)
-    if emotion != "neutral":
-        m.setdefault("mood_history",[]).append({"emotion":emotion,"ts":datetime.now().isoformat()[:10]})
-        if len(m["mood_history"])>20: m["mood_history"]=m["mood_history"][-20:]
-    for kw in ["i like","i love","i work","i live","my job","i study","i am","i enjoy","my goal"]:
-        if kw in text.lower() and len(text)<250 and text not in m["facts"]:
-            m["facts"].append(text.strip())
-            if len(m["facts"])>60: m["facts"]=m["facts"][-60:]
-            break
-    save_memory(m); return m
-
-def detect_emotion(t):
-    t=t.lower()
-    if any(w in t for w in ["sad","depressed","crying","hurt","lonely","heartbreak"]): return "sad"
-    if any(w in t for w in ["anxious","worried","stressed","panic","scared","overwhelmed"]): return "anxious"
-    if any(w in t for w in ["happy","great","amazing","excited","love","awesome","wonderful"]): return "happy"
-    if any(w in t for w in ["angry","frustrated","annoyed","mad","furious"]): return "angry"
-    if any(w in t for w in ["tired","exhausted","sleepy","drained"]): return "tired"
-    if any(w in t for w in ["motivated","ready","focused","let's go","pumped"]): return "motivated"
-    return "neutral"
-
-def check_wake_word(text):
-    patterns = [r"hey\s+opti(?:muz)?",r"hi\s+opti(?:muz)?",r"ok\s+opti(?:muz)?",
-                r"okay\s+opti(?:muz)?",r"hello\s+opti(?:muz)?",r"yo\s+opti(?:muz)?"]
-    t = text.lower()
-    for p in patterns:
-        if re.search(p, t):
-            clean = re.sub(p,"",t,flags=re.IGNORECASE).strip(" .,!?")
-            return True, clean
-    return False, text
-
-def ask_groq(message, memory, emotion):
-    from groq import Groq
-    ctx = ""
-    if memory.get("name"): ctx += f"User's name: {memory['name']}. Use it naturally.\n"
-    if memory.get("facts"): ctx += "Known facts:\n" + "\n".join(f"  - {f}" for f in memory["facts"][-10:]) + "\n"
-    if memory.get("mood_history"):
-        moods = [x["emotion"] for x in memory["mood_history"][-5:]]
-        ctx += f"Recent moods: {', '.join(moods)}\n"
-    eguide = {
-        "sad":"Lead with empathy. Be warm and present. Don't rush to fix.",
-        "anxious":"Be calm and grounding. Speak with steady reassurance.",
-        "happy":"Match their energy! Be warm and celebratory.",
-        "angry":"Acknowledge feelings first. Don't dismiss.",
-        "tired":"Be gentle and brief. Don't overwhelm.",
-        "motivated":"Be bold and energizing!",
-    }.get(emotion,"Respond naturally and warmly.")
-    system = f"""You are OPTIMUZ — a powerful AI companion inspired by Optimus Prime. Strong, wise, loyal, deeply caring.
-
-{ctx}
-Emotional context: {eguide}
-
-CRITICAL — spoken aloud:
-- 1-3 sentences MAX. Short and powerful.
-- NO bullet points, NO markdown, NO asterisks.
-- Calm authority + warmth, like Optimus Prime.
-- Auto-detect language and reply in same language.
-- Never robotic. Always genuine and present."""
-
-    history = load_recent_history(14)
-    msgs = [{"role":"system","content":system}]
-    for h in history[-12:]:
-        if h["role"] in ["user","assistant"]:
-            msgs.append({"role":h["role"],"content":h["content"]})
-    msgs.append({"role":"user","content":message})
-    client = Groq(api_key=GROQ_API_KEY)
-    resp = client.chat.completions.create(model="llama-3.3-70b-versatile",messages=msgs,max_tokens=180,temperature=0.82)
-    return resp.choices[0].message.content.strip()
-
-def transcribe_audio(audio_bytes):
-    from groq import Groq
-    with tempfile.NamedTemporaryFile(suffix=".wav",delete=False) as f:
-        f.write(audio_bytes); path=f.name
-    try:
-        client = Groq(api_key=GROQ_API_KEY)
-        with open(path,"rb") as af:
-            result = client.audio.transcriptions.create(
-                model="whisper-large-v3-turbo",
-                file=("audio.wav",af,"audio/wav"),
-                response_format="text"
-            )
-        return result.strip() if isinstance(result,str) else result.text.strip()
-    finally:
-        os.unlink(path)
-
-def speak(text):
-    import edge_tts
-    clean = re.sub(r"[*_`#\[\]]","",text).strip()
-    with tempfile.NamedTemporaryFile(suffix=".mp3",delete=False) as f: out_path=f.name
-    async def _gen():
-        c = edge_tts.Communicate(clean, EDGE_VOICE, rate="-8%", pitch="-15Hz", volume="+10%")
-        await c.save(out_path)
-    asyncio.run(_gen())
-    with open(out_path,"rb") as f: data=f.read()
-    os.unlink(out_path)
-    return base64.b64encode(data).decode()
-
-# ── Orb HTML builder ──────────────────────────────────────────────────────────
-def build_orb_html(state, status, transcript, name):
-    cfgs = {
-        "idle":      ("#0a1520","#162535","#1e3a50","rgba(30,80,140,0.3)", "orbFloat 5s ease-in-out infinite",          "#3a7abf"),
-        "listening": ("#0a1e30","#1a3d60","#2a6090","rgba(40,120,200,0.5)","orbListen 0.9s ease-in-out infinite",        "#4da6ff"),
-        "thinking":  ("#150d25","#2a1845","#3d2260","rgba(80,40,160,0.45)","none",                                       "#8855ee"),
-        "speaking":  ("#0a2015","#153520","#1e5030","rgba(20,140,80,0.45)","orbSpeak 0.5s ease-in-out infinite",         "#33cc77"),
-        "wake":      ("#0a2010","#155020","#209040","rgba(20,180,80,0.4)", "orbListen 0.6s ease-in-out infinite",        "#22ee66"),
-    }
-    c1,c2,c3,glow,anim,dot = cfgs.get(state, cfgs["idle"])
-    labels = {"idle":"STANDBY","listening":"LISTENING","thinking":"PROCESSING","speaking":"SPEAKING","wake":"WAKE WORD DETECTED"}
-
-    if state == "speaking":
-        inner = "<div style='display:flex;gap:4px;align-items:center'>" + \
-            "".join(f"<div style='width:3px;height:{h}px;background:rgba(0,255,150,0.9);border-radius:2px;animation:waveAnim 0.5s ease-in-out infinite;animation-delay:{i*0.08}s'></div>"
-                    for i,h in enumerate([8,14,22,30,22,14,8])) + "</div>"
-    elif state in ("listening","wake"):
-        inner = "<div style='font-size:32px;filter:drop-shadow(0 0 12px rgba(0,180,255,0.9))'>🎙️</div>"
-    elif state == "thinking":
-        inner = "<div style='display:flex;gap:7px'>" + \
-            "".join(f"<div style='width:9px;height:9px;border-radius:50%;background:rgba(160,80,255,0.95);animation:dotBounce 1.1s ease-in-out infinite;animation-delay:{i*0.2}s'></div>"
-                    for i in range(3)) + "</div>"
-    else:
-        inner = "<div style='font-size:32px;opacity:0.35;color:#0080cc;font-family:Orbitron,monospace'>&#8853;</div>"
-
-    subtitle = ("ONLINE &middot; " + name.upper()) if name else "v2.0 &middot; ALWAYS READY"
-    transcript_html = ""
-    if transcript:
-        transcript_html = "<div style='font-family:Exo 2,sans-serif;font-size:14px;color:#4a7090;margin-top:6px;padding:6px 14px;border-left:2px solid rgba(60,130,200,0.4);max-width:360px;margin-left:auto;margin-right:auto'>&ldquo;" + transcript + "&rdquo;</div>"
-
-    return f"""
-<div style="position:relative;z-index:1">
-  <div style="text-align:center;padding:12px 0 6px">
-    <div style="font-family:Orbitron,monospace;font-size:clamp(30px,8vw,46px);font-weight:900;
-      letter-spacing:clamp(5px,2vw,12px);background:linear-gradient(135deg,#a8d4f8 0%,#4a90d9 30%,#c8e8ff 55%,#5ba3e8 75%,#8ec8ff 100%);background-size:200% auto;animation:titleGlow 3s ease-in-out infinite;
-      -webkit-background-clip:text;background-clip:text;color:transparent;animation:titleGlow 3s ease-in-out infinite">
-      OPTIMUZ
-    </div>
-    <div style="font-family:Orbitron,monospace;font-size:clamp(8px,2vw,10px);letter-spacing:clamp(2px,1vw,5px);
-      color:#1e3a55;text-transform:uppercase;margin-top:3px;letter-spacing:4px">{subtitle}</div>
-  </div>
-
-  <div style="position:relative;width:clamp(180px,48vw,220px);height:clamp(180px,48vw,220px);
-    display:flex;align-items:center;justify-content:center;margin:8px auto">
-    <div style="position:absolute;width:110%;height:110%;border-radius:50%;
-      background:radial-gradient(circle,{glow} 0%,transparent 65%);animation:glowPulse 2.5s ease-in-out infinite"></div>
-    <div style="position:absolute;width:100%;height:100%;border-radius:50%;
-      border:1px solid rgba(0,180,255,0.12);animation:ringRot 10s linear infinite">
-      <div style="position:absolute;top:-4px;left:50%;width:7px;height:7px;background:{dot};border-radius:50%;box-shadow:0 0 14px {dot}"></div>
-    </div>
-    <div style="position:absolute;width:85%;height:85%;border-radius:50%;
-      border:1px solid rgba(50,120,200,0.1);animation:ringRotR 7s linear infinite">
-      <div style="position:absolute;bottom:-3px;left:40%;width:5px;height:5px;background:#4a90d9;border-radius:50%;box-shadow:0 0 10px #4a90d9"></div>
-    </div>
-    <div style="width:72%;height:72%;border-radius:50%;
-      background:radial-gradient(circle at 32% 32%,{c3} 0%,{c2} 40%,{c1} 100%);
-      box-shadow:0 0 50px {glow},inset 0 0 30px rgba(0,0,0,0.6),inset 0 3px 8px rgba(255,255,255,0.06);
-      animation:{anim};display:flex;align-items:center;justify-content:center;
-      position:relative;overflow:hidden;transition:all 0.6s ease">
-      <div style="position:absolute;top:12%;left:16%;width:38%;height:22%;border-radius:50%;
-        background:radial-gradient(ellipse,rgba(255,255,255,0.09) 0%,transparent 100%)"></div>
-      <div style="position:absolute;width:100%;height:2px;
-        background:linear-gradient(90deg,transparent,rgba(0,220,255,0.3),transparent);
-        animation:scanAnim 2.5s linear infinite"></div>
-      {inner}
-    </div>
-  </div>
-
-  <div style="text-align:center;margin:6px 0 10px">
-    <div style="font-family:Orbitron,monospace;font-size:clamp(8px,2vw,10px);letter-spacing:3px;
-      text-transform:uppercase;color:{dot};margin-bottom:5px">&#9679; {labels.get(state,"STANDBY")}</div>
-    <div style="font-family:Exo 2,sans-serif;font-size:clamp(13px,3.5vw,15px);color:#1e3a55;font-style:italic;min-height:20px">{status}</div>
-    {transcript_html}
-  </div>
-</div>"""
-
-def render_orb(state="idle", status="", transcript=""):
-    memory = st.session_state.get("memory", {})
-    name = memory.get("name","")
-    html = build_orb_html(state, status, transcript, name)
-    st.markdown(html, unsafe_allow_html=True)
+st.markdown(CSS, unsafe_allow_html=True)
 
 # ── Chat renderer ─────────────────────────────────────────────────────────────
 def render_chat(messages):
     if not messages: return
-    st.markdown("<div style='font-family:Orbitron,monospace;font-size:9px;letter-spacing:3px;color:#1a3248;text-transform:uppercase;margin:12px 0 8px;padding-bottom:6px;border-bottom:1px solid rgba(0,100,150,0.12)'>&#9672; Transmission Log</div>", unsafe_allow_html=True)
-    rows = ""
-    for m in messages[-16:]:
-        content = m["content"].replace("<","&lt;").replace(">","&gt;")
-        if m["role"] == "user":
-            rows += f"<div class='msg-anim' style='display:flex;justify-content:flex-end;margin:5px 0'><div style='max-width:80%;background:linear-gradient(135deg,rgba(20,60,120,0.75),rgba(10,30,65,0.65));border:1px solid rgba(50,110,200,0.25);border-radius:16px 16px 3px 16px;padding:9px 14px;font-family:Exo 2,sans-serif;font-size:clamp(12px,3vw,14px);color:#8bbfe0;line-height:1.5'>{content}</div></div>"
-        else:
-            rows += f"<div class='msg-anim' style='display:flex;justify-content:flex-start;margin:5px 0'><div style='max-width:80%;background:rgba(8,18,32,0.9);border:1px solid rgba(40,90,150,0.2);border-radius:16px 16px 16px 3px;padding:9px 14px;font-family:Exo 2,sans-serif;font-size:clamp(12px,3vw,14px);color:#7aaec8;line-height:1.5'>{content}</div></div>"
-    st.markdown(f"<div style='max-height:260px;overflow-y:auto;padding-right:4px'>{rows}</div>", unsafe_allow_html=True)
+    st.markdown(LOG_HEAD, unsafe_allow_html=True)
+    st.markdown(chat_html(messages), unsafe_allow_html=True)
 
 # ── Session state ─────────────────────────────────────────────────────────────
-for k,v in [("messages",[]),("memory",load_memory()),("last_audio_id",None),("total",0),
+for k,v in [("messages",[]),("memory",OPTIMUZ.load_memory()),("last_audio_id",None),("total",0),
              ("orb_state","idle"),("orb_status","Speak to OPTIMUZ below ↓"),("orb_transcript","")]:
     if k not in st.session_state: st.session_state[k]=v
 
-if not GROQ_API_KEY:
+if not GROQ_API_KEY and BACKEND != "fake":
     st.error("Add GROQ_API_KEY to your .env file! Get it free at https://console.groq.com")
     st.stop()
 
 # ── Single Orb (updates in place) ────────────────────────────────────────────
-orb_slot = st.empty()
+orb = OrbView(st.empty(), st.empty())
 
 def update_orb(state, status="", transcript=""):
     st.session_state.orb_state      = state
     st.session_state.orb_status     = status
     st.session_state.orb_transcript = transcript
-    orb_slot.markdown(build_orb_html(
-        state, status, transcript,
-        st.session_state.get("memory",{}).get("name","")
-    ), unsafe_allow_html=True)
+    orb.update(state, status, transcript, st.session_state.get("memory",{}).get("name",""))
 
 update_orb(st.session_state.orb_state, st.session_state.orb_status, st.session_state.orb_transcript)
 
+def play(text, audio):
+    """Queue one reply clip: wait for the previous clip to end, then swap it into the audio slot."""
+    if audio is None:
+        st.write(f"**OPTIMUZ:** {text}"); return
+    if audio in st.session_state.played: return     # st.audio ids are derived from the data
+    st.session_state.played.add(audio)
+    time.sleep(max(0.0, st.session_state.play_until - time.monotonic()))
+    audio_slot.audio(audio, format="audio/mp3", autoplay=True)
+    st.session_state.play_until = time.monotonic() + mp3_seconds(audio)
+
 # ── Hide the default audio widget UI, show only mic button ────────────────────
 st.markdown("""
 <style>
@@ -332,58 +190,32 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ── Process audio ──────────────────────────────────────────────────────────────
+outcome = None
 if audio_value is not None:
     audio_id = id(audio_value)
     if audio_id != st.session_state.last_audio_id:
         st.session_state.last_audio_id = audio_id
-        audio_bytes = audio_value.read()
+        audio_bytes = audio_value.getvalue()
 
         if len(audio_bytes) > 800:
-            update_orb("thinking","Transcribing your voice...")
-            try:
-                transcript = transcribe_audio(audio_bytes)
-            except Exception as e:
-                update_orb("idle","Error. Try again."); st.stop()
-
-            if not transcript or len(transcript.strip()) < 2:
-                update_orb("idle","Couldn't hear that. Try again.")
-                st.stop()
-
-            wake, clean = check_wake_word(transcript)
-            if wake and not clean.strip():
-                update_orb("wake","Wake word heard! Speak your message...")
-                st.stop()
-
-            final = clean if wake else transcript
-            emotion = detect_emotion(final)
-            memory  = update_memory(final, emotion)
-            st.session_state.memory = memory
-
-            update_orb("listening","Got it!", final)
-            st.session_state.messages.append({"role":"user","content":final})
-            append_history("user", final, emotion)
-
-            update_orb("thinking","OPTIMUZ is thinking...")
-            try:
-                reply = ask_groq(final, memory, emotion)
-            except Exception as e:
-                update_orb("idle","AI error. Try again."); st.stop()
-
-            st.session_state.messages.append({"role":"assistant","content":reply})
-            append_history("assistant", reply)
-            st.session_state.total += 1
-
-            update_orb("speaking", reply[:70]+"..." if len(reply)>70 else reply)
-            try:
-                audio_out = speak(reply)
-                st.audio(base64.b64decode(audio_out), format="audio/mp3", autoplay=True)
-            except Exception as e:
-                st.write(f"**OPTIMUZ:** {reply}")
-
-            update_orb("idle","Tap the mic and speak!")
+            TRACER.begin(backend=BACKEND, streaming=STREAMING)
+            audio_slot = st.empty()
+            st.session_state.played, st.session_state.play_until = set(), 0.0
+            turn = OPTIMUZ.turn(audio_bytes, STREAMING, update_orb, play)
+            outcome = turn.outcome
+            if turn.vad: st.session_state.vad = turn.vad
+            if turn.prompt_stats: st.session_state.prompt_stats = turn.prompt_stats
+            if turn.memory: st.session_state.memory = turn.memory
+            if turn.text: st.session_state.messages.append({"id":uuid.uuid4().hex[:8],"role":"user","content":turn.text})
+            if turn.reply is not None:
+                st.session_state.messages.append({"id":uuid.uuid4().hex[:8],"role":"assistant","content":turn.reply})
+                st.session_state.total += 1
+            del st.session_state.messages[:-CHAT_KEEP]
 
 # ── Chat log ──────────────────────────────────────────────────────────────────
-render_chat(st.session_state.messages)
+with TRACER.stage("render", messages=len(st.session_state.messages)):
+    render_chat(st.session_state.messages)
+TRACER.end(outcome or "ok")
 
 # ── Footer ────────────────────────────────────────────────────────────────────
 name = st.session_state.memory.get("name","")
@@ -393,7 +225,7 @@ st.markdown(f"<div style='text-align:center;font-family:Orbitron,monospace;font-
 # ── Sidebar ───────────────────────────────────────────────────────────────────
 with st.sidebar:
     st.markdown("### 🤖 OPTIMUZ Memory")
-    m = load_memory()
+    m = OPTIMUZ.load_memory()
     if m.get("name"): st.success(f"Name: **{m['name']}**")
     if m.get("last_seen"): st.caption(f"Last seen: {m['last_seen'][:10]}")
     if m.get("facts"):
@@ -407,6 +239,27 @@ with st.sidebar:
     st.caption(f"Voice: {EDGE_VOICE}")
     st.caption("Model: llama-3.3-70b-versatile")
     st.caption("STT: Groq Whisper Large v3 Turbo")
+    st.caption(f"Backend: {BACKEND} · {'streaming' if STREAMING else 'full reply'} TTS")
+    if ps := st.session_state.get("prompt_stats"):
+        st.caption(f"Last prompt: ~{ps['total']} tokens (system {ps['system']} · {ps['turns']} turns {ps['history']} · message {ps['message']}"
+                   + (f" · {ps['dropped']} turns trimmed" if ps["dropped"] else "")
+                   + (f" · {ps['recalled']} recalled" if ps["recalled"] else "") + ")")
+    st.caption(f"Recall index: {len(OPTIMUZ.index.docs)} snippets")
+    segs, hist_bytes = OPTIMUZ.history.usage()
+    st.caption(f"History: {hist_bytes/1e6:.1f} MB on disk · {segs} closed segments")
+    if (v := st.session_state.get("vad")) and v.get("vad"):
+        st.caption(f"Last clip: {v['in_s']}s → {v.get('out_s', 0)}s sent · {v['in_bytes']//1024} → {v['out_bytes']//1024} KB")
+    cs = tts_cache().stats()
+    st.caption(f"TTS cache: {cs['hits']} hits · {cs['misses']} misses · {cs['entries']} clips · {cs['bytes']/1e6:.1f} MB")
+    if rc := reply_cache():
+        rs = rc.stats()
+        st.caption(f"Reply cache: {rs['hit_rate']:.0%} hit rate · {rs['hits']} hits · {rs['misses']} misses · {rs['keys']} utterances")
+    st.markdown("---")
+    st.markdown("### ⏱ Latency")
+    if lat := TRACER.summary():
+        st.markdown("| stage | p50 | p95 | n |\n|---|--:|--:|--:|\n" + "\n".join(
+            f"| {k}{' ⚠'+str(v['errors']) if v['errors'] else ''} | {v['p50']:.0f} ms | {v['p95']:.0f} ms | {v['n']} |" for k,v in lat.items()))
+    else: st.caption("No turns recorded yet.")
     st.markdown("---")
     st.markdown("**Wake words:**")
     st.caption("Hey / Hi / OK / Hello Optimuz")
@@ -416,11 +269,10 @@ with st.sidebar:
     c1,c2 = st.columns(2)
     with c1:
         if st.button("🗑 Memory",use_container_width=True):
-            save_memory({"facts":[],"name":None,"last_seen":None,"mood_history":[]})
-            st.session_state.memory = load_memory()
+            st.session_state.memory = OPTIMUZ.clear_memory()
             st.rerun()
     with c2:
         if st.button("🗑 History",use_container_width=True):
-            if HISTORY_FILE.exists(): HISTORY_FILE.unlink()
+            OPTIMUZ.clear_history()
             st.session_state.messages = []
             st.rerun()
\ No newline at end of file
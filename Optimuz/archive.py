@@ -0,0 +1,65 @@
+"""OPTIMUZ archive - closed history segments compacted into compressed column arrays"""
+
+import io, json
+import numpy as np
+from storage import atomic_write
+
+FIELDS = ("ts","role","emotion","content")
+
+def read_jsonl(path):
+    """Records of a JSONL file, skipping torn or foreign lines."""
+    with open(path, "rb") as f:
+        for line in f:
+            try: rec = json.loads(line)
+            except ValueError: continue
+            if isinstance(rec, dict): yield rec
+
+def _times(values):
+    try: return np.array(values, dtype="datetime64[us]")
+    except ValueError:                            # one bad timestamp: parse one by one
+        out = np.empty(len(values), dtype="datetime64[us]")
+        for i, v in enumerate(values):
+            try: out[i] = np.datetime64(v, "us")
+            except ValueError: out[i] = np.datetime64("NaT")
+        return out
+
+def to_columns(records, fields=FIELDS):
+    """{field: array} for a list of history records; ts is datetime64[us] (NaT if missing),
+    role and emotion are str arrays, content a list of str."""
+    cols = {}
+    if "ts" in fields: cols["ts"] = _times([r.get("ts") or r.get("timestamp") or "NaT" for r in records])   # "timestamp": pre-v2 records
+    for f in ("role", "emotion"):
+        if f in fields: cols[f] = np.array([str(r.get(f) or "") for r in records])
+    if "content" in fields: cols["content"] = [str(r.get("content", "")) for r in records]
+    return cols
+
+def compact(segment, archive):
+    """Write a JSONL segment as an .npz archive: ts, role/emotion as uint8 codes
+    plus their vocabularies, content as one UTF-8 blob with offsets."""
+    cols = to_columns(list(read_jsonl(segment)))
+    arrays = {"ts":cols["ts"]}
+    for f in ("role", "emotion"):
+        vocab, codes = np.unique(cols[f], return_inverse=True)
+        arrays[f + "_vocab"], arrays[f] = vocab, codes.astype(np.uint8 if len(vocab) < 256 else np.uint32)
+    encoded = [c.encode("utf-8") for c in cols["content"]]
+    arrays["offsets"] = np.cumsum([0] + [len(b) for b in encoded], dtype=np.int64)
+    arrays["text"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **arrays)
+    atomic_write(archive, buf.getvalue())
+
+def read_archive(path, fields=FIELDS):
+    """Columns of an archive, as to_columns() returns them. Only the requested
+    arrays are decompressed, so a mood report never touches the text."""
+    cols = {}
+    with np.load(path, allow_pickle=False) as z:
+        if "ts" in fields: cols["ts"] = z["ts"]
+        for f in ("role", "emotion"):
+            if f in fields: cols[f] = z[f + "_vocab"][z[f]]
+        if "content" in fields:
+            text, off = z["text"].tobytes(), z["offsets"]
+            cols["content"] = [text[off[i]:off[i + 1]].decode("utf-8") for i in range(len(off) - 1)]
+    return cols
+
+def select(cols, mask):
+    return {k: (v[mask] if isinstance(v, np.ndarray) else [x for x, keep in zip(v, mask) if keep]) for k, v in cols.items()}
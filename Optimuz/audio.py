@@ -0,0 +1,63 @@
+"""OPTIMUZ audio - in-memory WAV decode, silence trimming and 16 kHz resampling before STT"""
+
+import io, wave
+from math import gcd
+import numpy as np
+from scipy.signal import resample_poly
+
+STT_RATE = 16000
+
+def decode_wav(data):
+    """(float32 mono samples in [-1, 1], sample rate), or None if data isn't PCM WAV we can read."""
+    try:
+        with wave.open(io.BytesIO(data)) as w:
+            ch, width, rate, n = w.getnchannels(), w.getsampwidth(), w.getframerate(), w.getnframes()
+            raw = w.readframes(n)
+    except (wave.Error, EOFError):
+        return None
+    if width == 1: x = (np.frombuffer(raw, np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2: x = np.frombuffer(raw, "<i2").astype(np.float32) / 32768
+    elif width == 4: x = np.frombuffer(raw, "<i4").astype(np.float32) / 2147483648
+    else: return None
+    if ch > 1: x = x[: len(x) // ch * ch].reshape(-1, ch).mean(axis=1)
+    return x, rate
+
+def encode_wav(x, rate):
+    """16-bit mono PCM WAV bytes."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1); w.setsampwidth(2); w.setframerate(rate)
+        w.writeframes((np.clip(x, -1, 1) * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+def resample(x, rate, target=STT_RATE):
+    if rate == target: return x
+    g = gcd(rate, target)
+    return resample_poly(x, target // g, rate // g).astype(np.float32)
+
+def speech_frames(x, rate, frame_ms=30, margin_db=12.0, floor_db=-50.0, loud_db=-35.0):
+    """Boolean mask of frames louder than the clip's noise floor (10th percentile)
+    + margin. The threshold stays within [floor_db, loud_db], so a clip that is
+    speech from end to end isn't mistaken for noise."""
+    n = int(rate * frame_ms / 1000)
+    frames = x[: len(x) // n * n].reshape(-1, n)
+    if not len(frames): return np.zeros(0, bool), n
+    db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    return db > min(max(np.percentile(db, 10) + margin_db, floor_db), loud_db), n
+
+def prepare_for_stt(data, min_speech_s=0.25, pad_s=0.2):
+    """Trim leading/trailing silence and downsample to 16 kHz mono.
+    Returns (wav bytes | None, info); None means no speech, skip the STT call.
+    Audio that isn't a readable WAV is passed through untouched."""
+    info = {"in_bytes": len(data)}
+    decoded = decode_wav(data)
+    if decoded is None: return data, {**info, "out_bytes": len(data), "vad": False}
+    x, rate = decoded
+    speech, n = speech_frames(x, rate)
+    info.update(vad=True, in_s=round(len(x) / rate, 2), speech_s=round(speech.sum() * n / rate, 2))
+    if speech.sum() * n < min_speech_s * rate: return None, {**info, "out_bytes": 0}
+    idx = np.flatnonzero(speech)
+    pad = int(pad_s * rate)
+    start, end = max(0, idx[0] * n - pad), min(len(x), (idx[-1] + 1) * n + pad)
+    out = encode_wav(resample(x[start:end], rate), STT_RATE)   # trim first, resample only what is sent
+    return out, {**info, "out_bytes": len(out), "out_s": round((end - start) / rate, 2)}
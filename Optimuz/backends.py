@@ -0,0 +1,129 @@
+"""OPTIMUZ backends - Groq / edge-tts and offline stand-ins behind one interface
+
+STT:  async transcribe(audio_bytes) -> str
+LLM:  async complete(msgs) -> str,  async stream(msgs) -> token strings
+TTS:  async synthesize(text) -> mp3 bytes
+Any of them may add async warm() to open connections ahead of a request.
+"""
+
+import re, time, asyncio
+from pathlib import Path
+
+LLM_MODEL   = "llama-3.3-70b-versatile"
+STT_MODEL   = "whisper-large-v3-turbo"
+TTS_PROSODY = {"rate":"-8%","pitch":"-15Hz","volume":"+10%"}
+SAMPLE_MP3  = Path(__file__).with_name("test.mp3")
+
+def clean_for_speech(text): return re.sub(r"[*_`#\[\]]","",text).strip()
+
+# ── Groq / edge-tts ──────────────────────────────────────────────────────────
+class GroqClient:
+    """One AsyncGroq (one HTTP connection pool) shared by STT and LLM. Built on
+    first use so it binds to the event loop that runs the calls; retries are
+    left to the service layer."""
+    def __init__(self, api_key): self.api_key, self._client, self._warmed = api_key, None, 0.0
+
+    def get(self):
+        if self._client is None:
+            from groq import AsyncGroq
+            self._client = AsyncGroq(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    async def warm(self):
+        """Open a pooled connection now (a cheap models.list) so the next
+        request skips DNS and TLS setup; STT and LLM share one warm-up."""
+        if time.monotonic() - self._warmed < 1.0: return
+        self._warmed = time.monotonic()
+        await self.get().models.list()
+
+class GroqSTT:
+    def __init__(self, groq): self.groq = groq
+
+    async def warm(self): await self.groq.warm()
+
+    async def transcribe(self, audio_bytes):
+        result = await self.groq.get().audio.transcriptions.create(
+            model=STT_MODEL, file=("audio.wav",bytes(audio_bytes),"audio/wav"), response_format="text")
+        return result.strip() if isinstance(result,str) else result.text.strip()
+
+class GroqLLM:
+    def __init__(self, groq, model=LLM_MODEL, max_tokens=180, temperature=0.82):
+        self.groq, self.model, self.max_tokens, self.temperature = groq, model, max_tokens, temperature
+
+    async def warm(self): await self.groq.warm()
+
+    async def complete(self, msgs):
+        resp = await self.groq.get().chat.completions.create(
+            model=self.model, messages=msgs, max_tokens=self.max_tokens, temperature=self.temperature)
+        return resp.choices[0].message.content.strip()
+
+    async def stream(self, msgs):
+        resp = await self.groq.get().chat.completions.create(
+            model=self.model, messages=msgs, max_tokens=self.max_tokens, temperature=self.temperature, stream=True)
+        async for chunk in resp:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta: yield delta
+
+class EdgeTTS:
+    def __init__(self, voice, **prosody): self.voice, self.prosody = voice, {**TTS_PROSODY, **prosody}
+
+    async def synthesize(self, text):
+        import edge_tts
+        c = edge_tts.Communicate(clean_for_speech(text), self.voice, **self.prosody)
+        return b"".join([ch["data"] async for ch in c.stream() if ch["type"] == "audio"])
+
+# ── Offline stand-ins ────────────────────────────────────────────────────────
+class FakeSTT:
+    """Returns the transcript (or cycles through a list of them) after a delay."""
+    def __init__(self, transcript="Hey Optimuz, I love building robots. What should I make next?", delay=0.3):
+        self.transcripts = [transcript] if isinstance(transcript, str) else list(transcript)
+        self.delay, self.calls = delay, 0
+
+    async def transcribe(self, audio_bytes):
+        await asyncio.sleep(self.delay)
+        self.calls += 1
+        return self.transcripts[(self.calls - 1) % len(self.transcripts)]
+
+class FakeLLM:
+    """Replays a canned reply word by word with a first-token and per-token delay.
+    vary=True numbers each reply, so no two turns say the same thing (as a sampled LLM)."""
+    def __init__(self, reply=None, first_token=0.35, per_token=0.03, vary=False):
+        self.reply = reply or ("Build something that helps the people around you. "
+                               "A small rover that carries groceries would be a fine start! "
+                               "Every great machine begins with one bold step, and I will be with you.")
+        self.first_token, self.per_token, self.vary, self.calls = first_token, per_token, vary, 0
+
+    def next_reply(self):
+        self.calls += 1
+        return f"Reply {self.calls}. {self.reply}" if self.vary else self.reply
+
+    async def complete(self, msgs):
+        reply = self.next_reply()
+        await asyncio.sleep(self.first_token + self.per_token * len(re.findall(r"\S+\s*", reply))); return reply.strip()
+
+    async def stream(self, msgs):
+        await asyncio.sleep(self.first_token)
+        for tok in re.findall(r"\S+\s*", self.next_reply()):
+            yield tok; await asyncio.sleep(self.per_token)
+
+def _id3_title(text):
+    """ID3v2.3 tag holding text as the title, so each fake clip has distinct bytes."""
+    data = b"\x00" + text.encode("latin-1","replace")
+    frame = b"TIT2" + len(data).to_bytes(4,"big") + b"\x00\x00" + data
+    n = len(frame)
+    return b"ID3\x03\x00\x00" + bytes([(n>>21)&0x7f,(n>>14)&0x7f,(n>>7)&0x7f,n&0x7f]) + frame
+
+class FakeTTS:
+    """Returns the bundled sample MP3, tagged with the text, after a delay that grows with text length."""
+    def __init__(self, base=0.15, per_char=0.004, audio=None):
+        self.base, self.per_char, self.voice, self.prosody = base, per_char, "fake", {}
+        self.audio = audio if audio is not None else (SAMPLE_MP3.read_bytes() if SAMPLE_MP3.exists() else b"")
+
+    async def synthesize(self, text):
+        await asyncio.sleep(self.base + self.per_char * len(text)); return _id3_title(text) + self.audio
+
+def make_backends(kind, api_key="", voice="en-US-ChristopherNeural"):
+    """Return (stt, llm, tts) for OPTIMUZ_BACKEND=groq|fake."""
+    if kind == "fake": return FakeSTT(), FakeLLM(), FakeTTS()
+    groq = GroqClient(api_key)
+    return GroqSTT(groq), GroqLLM(groq), EdgeTTS(voice)
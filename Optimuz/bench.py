@@ -0,0 +1,488 @@
+"""OPTIMUZ benchmarks - run offline, e.g. `python bench.py history`"""
+
+import sys, json, time, tempfile, argparse
+from pathlib import Path
+
+def timeit(fn, repeat=50):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); best = min(best, time.perf_counter() - t0)
+    return best
+
+NO_ROTATION = {"segment_bytes":1 << 40, "segment_days":0}   # synthetic history stays one file, as sized
+
+def now_ts(): return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+def make_history(path, lines):
+    rec = json.dumps({"ts":now_ts(),"role":"user","content":"I love long walks on the beach at sunset","emotion":"happy"})+"\n"
+    block = rec * 10_000
+    with open(path,"w",encoding="utf-8") as f:
+        for _ in range(lines // 10_000): f.write(block)
+        f.write(rec * (lines % 10_000))
+
+# ── history ──────────────────────────────────────────────────────────────────
+def bench_history(args):
+    from storage import HistoryStore, tail_lines
+    def full_read(p, n):
+        lines = p.read_text(encoding="utf-8").strip().split("\n")
+        return [json.loads(l) for l in lines[-n:] if l.strip()]
+    print(f"{'lines':>10} {'tail-seek':>12} {'full-read':>12}")
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "history.jsonl"
+        for lines in args.sizes:
+            make_history(path, lines)
+            store = HistoryStore(path)
+            assert store.recent(args.n) == full_read(path, args.n)
+            tail = timeit(lambda: store.recent(args.n))
+            full = timeit(lambda: full_read(path, args.n), repeat=3) if lines <= args.full_max else None
+            print(f"{lines:>10} {tail*1e6:>10.1f}us " + (f"{full*1e3:>10.1f}ms" if full is not None else f"{'skipped':>12}"))
+
+# ── stream ───────────────────────────────────────────────────────────────────
+def bench_stream(args):
+    import asyncio
+    from backends import FakeLLM, FakeTTS
+    from pipeline import speak_stream
+    llm = FakeLLM(first_token=args.first_token, per_token=args.per_token)
+    tts = FakeTTS(base=args.tts_base, per_char=args.tts_per_char)
+    async def sequential():
+        t0 = time.perf_counter()
+        text = "".join([tok async for tok in llm.stream([])])
+        await tts.synthesize(text)
+        return time.perf_counter() - t0
+    async def streaming():
+        t0 = time.perf_counter()
+        async for _ in speak_stream(llm, tts, []): return time.perf_counter() - t0
+    seq, stream = asyncio.run(sequential()), asyncio.run(streaming())
+    print(f"time to first audio: full reply {seq*1e3:.0f}ms, streaming {stream*1e3:.0f}ms ({stream/seq:.0%})")
+
+# ── audio ────────────────────────────────────────────────────────────────────
+def bench_audio(args):
+    """Per-turn audio I/O: old temp-file + base64 path vs in-memory bytes (network excluded).
+    Both sides take the mic upload the same way and build the reply from the same
+    edge-tts chunk stream; only what happens in between differs."""
+    import os, io, base64, tracemalloc
+    mic = io.BytesIO(os.urandom(args.wav_kb << 10))            # st.audio_input's UploadedFile is a BytesIO
+    mp3 = os.urandom(args.mp3_kb << 10)
+    stream = []                                                 # edge-tts Communicate.stream(): audio + word boundaries
+    for i in range(0, len(mp3), 4096):
+        stream += [{"type":"audio", "data":mp3[i:i + 4096]}, {"type":"WordBoundary", "offset":i, "text":"word"}]
+    def before():                                               # the old app.py transcribe_audio() + speak()
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f: f.write(mic.getvalue()); path = f.name
+        with open(path, "rb") as af: af.read()                  # Groq reads the file object
+        os.unlink(path)
+        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f: out = f.name
+        with open(out, "wb") as f:                              # Communicate.save()
+            for ch in stream:
+                if ch["type"] == "audio": f.write(ch["data"])
+        with open(out, "rb") as f: data = f.read()
+        os.unlink(out)
+        return base64.b64decode(base64.b64encode(data).decode())   # speak() returned base64, st.audio decoded it
+    def after():                                                # app.py getvalue(), GroqSTT, EdgeTTS.synthesize
+        bytes(mic.getvalue())
+        return b"".join([ch["data"] for ch in stream if ch["type"] == "audio"])
+    assert before() == after() == mp3
+    for name, fn in (("before", before), ("after", after)):
+        tracemalloc.start(); fn(); peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+        print(f"{name:>7}: {timeit(fn, 200)*1e6:>8.0f}us/turn  peak alloc {peak/1024:>7.0f} KiB")
+
+# ── services ─────────────────────────────────────────────────────────────────
+def bench_services(args):
+    """Fixed per-call cost: a fresh event loop per call vs the persistent service loop."""
+    import asyncio
+    from backends import FakeTTS
+    from services import Services
+    tts = FakeTTS(base=0, per_char=0)
+    svc = Services(None, None, tts)
+    fresh = timeit(lambda: asyncio.run(tts.synthesize("hi")), args.repeat)
+    warm = timeit(lambda: svc.run(svc.synthesize("hi")), args.repeat)
+    print(f"asyncio.run per call {fresh*1e6:.0f}us, persistent loop {warm*1e6:.0f}us")
+
+# ── analyzers ────────────────────────────────────────────────────────────────
+def legacy_analyze(text):
+    """The per-utterance scans app.py did before analyzers.py (for comparison)."""
+    import re
+    t = text.lower(); emotion = "neutral"
+    for e, kws in (("sad",["sad","depressed","crying","hurt","lonely","heartbreak"]),
+                   ("anxious",["anxious","worried","stressed","panic","scared","overwhelmed"]),
+                   ("happy",["happy","great","amazing","excited","love","awesome","wonderful"]),
+                   ("angry",["angry","frustrated","annoyed","mad","furious"]),
+                   ("tired",["tired","exhausted","sleepy","drained"]),
+                   ("motivated",["motivated","ready","focused","let's go","pumped"])):
+        if any(w in t for w in kws): emotion = e; break
+    wake, clean = False, text
+    for p in [r"hey\s+opti(?:muz)?",r"hi\s+opti(?:muz)?",r"ok\s+opti(?:muz)?",
+              r"okay\s+opti(?:muz)?",r"hello\s+opti(?:muz)?",r"yo\s+opti(?:muz)?"]:
+        if re.search(p, t): wake, clean = True, re.sub(p,"",t,flags=re.IGNORECASE).strip(" .,!?"); break
+    name = re.search(r"(?:my name is|i'm|i am|call me)\s+([A-Z][a-z]+)", text, re.IGNORECASE)
+    facts = [kw for kw in ["i like","i love","i work","i live","my job","i study","i am","i enjoy","my goal"] if kw in text.lower()]
+    return emotion, wake, clean, facts, name and name.group(1)
+
+def utterances(n, seed=7):
+    import random
+    rnd = random.Random(seed)
+    words = ("hey optimuz i am so tired today my name is Sam and I love robots what should we build next "
+             "the weather is great but I feel lonely sometimes call me Alex I work at the hospital ready "
+             "thank you good night okay opti let's go worried about exams").split()
+    return [" ".join(rnd.choice(words) for _ in range(rnd.randint(3, 30))) for _ in range(n)]
+
+def bench_analyzers(args):
+    from analyzers import TextAnalyzer, FACT_KEYWORDS
+    analyzer = TextAnalyzer()
+    texts = utterances(args.n)
+    for x in texts:                               # same answers; facts come in text order, not keyword order
+        a = analyzer.analyze(x)
+        assert legacy_analyze(x) == (a.emotion, a.wake, a.clean, sorted(a.facts, key=FACT_KEYWORDS.index), a.name), x
+    for name, fn in (("legacy", legacy_analyze), ("single-pass", analyzer.analyze)):
+        t = timeit(lambda: [fn(x) for x in texts], args.repeat)
+        print(f"{name:>12}: {len(texts)/t:>10,.0f} utterances/s")
+
+# ── recall ───────────────────────────────────────────────────────────────────
+def bench_recall(args):
+    import random
+    from retrieval import MemoryIndex
+    rnd = random.Random(3)
+    vocab = [f"w{i}" for i in range(args.vocab)]
+    queries = [" ".join(rnd.choices(vocab, k=6)) for _ in range(200)]
+    print(f"{'turns':>9} {'index':>9} {'search p50':>11} {'p99':>9}")
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "history.jsonl"
+        for n in args.sizes:
+            with open(path, "w", encoding="utf-8") as f:
+                for i in range(n):
+                    f.write(json.dumps({"ts":"","role":"user","content":" ".join(rnd.choices(vocab, k=12))})+"\n")
+            index = MemoryIndex(path, initial_bytes=1 << 40)
+            t0 = time.perf_counter(); index.sync(); build = time.perf_counter() - t0
+            lat = []
+            for q in queries:
+                t0 = time.perf_counter(); index.search(q, 3, budget_ms=args.budget_ms); lat.append(time.perf_counter() - t0)
+            lat.sort()
+            print(f"{n:>9} {build:>8.2f}s {lat[len(lat)//2]*1e3:>9.2f}ms {lat[int(len(lat)*.99)]*1e3:>7.2f}ms")
+
+# ── e2e ──────────────────────────────────────────────────────────────────────
+E2E_TRANSCRIPTS = ["Hey Optimuz, I love building robots. What should I make next?",
+                   "I am so tired after work today.", "My name is Sam and I work at the hospital.",
+                   "hey optimuz", "Thank you, that really helps!", "I'm worried about my exams next week.",
+                   "What did I tell you about my sister?", "Good night Optimuz."]
+
+def make_data(root, lines, facts):
+    """history.jsonl with `lines` varied turns and memory.json with `facts` facts."""
+    root.mkdir(parents=True, exist_ok=True)
+    texts = utterances(min(lines, 50_000) or 1)
+    ts = now_ts()
+    with open(root / "history.jsonl", "w", encoding="utf-8") as f:
+        for i in range(lines):
+            f.write(json.dumps({"ts":ts,"role":("user","assistant")[i % 2],
+                                "content":texts[i % len(texts)],"emotion":"neutral"})+"\n")
+    (root / "memory.json").write_text(json.dumps({"facts":[f"I like topic number {i}" for i in range(facts)],
+                                                  "name":"Sam","last_seen":None,"mood_history":[]}))
+
+def speech_wav(seconds=3.0, rate=48_000):
+    import numpy as np
+    from audio import encode_wav
+    t = np.arange(int(rate * seconds)) / rate
+    x = 0.3 * np.sin(2 * np.pi * 180 * t) * (np.abs(t - seconds / 2) < seconds / 4)   # speech in the middle half
+    return encode_wav(x + np.random.default_rng(0).normal(0, 0.002, len(t)), rate)
+
+def bench_e2e(args):
+    """Full turns through Companion with offline backends, per history/memory size."""
+    import resource, tracemalloc
+    from backends import FakeSTT, FakeLLM, FakeTTS
+    from cache import AudioCache, CachedTTS
+    from services import Services
+    from tracing import Tracer
+    from companion import Companion
+    reply = " ".join(["Stand tall and keep building, my friend."] * max(1, args.reply_sentences))
+    wav, results = speech_wav(), []
+    for lines in args.sizes:
+        with tempfile.TemporaryDirectory() as d:
+            root = Path(d)
+            make_data(root, lines, args.facts)
+            tts = FakeTTS(base=args.tts_base, per_char=args.tts_per_char)
+            svc = Services(FakeSTT(E2E_TRANSCRIPTS, delay=args.stt_delay),
+                           FakeLLM(reply, first_token=args.first_token, per_token=args.per_token),
+                           CachedTTS(tts, AudioCache(root / "tts_cache")) if args.tts_cache else tts)
+            tracer = Tracer(root / "metrics.jsonl")
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            bot = Companion(root, svc, tracer, **NO_ROTATION)
+            bot.index.sync(bot.load_memory().get("facts", []))        # first-turn index build, timed as startup
+            startup = time.perf_counter() - t0
+            t0, outcomes = time.perf_counter(), {}
+            for _ in range(args.turns):
+                tracer.begin()
+                turn = bot.turn(wav, not args.no_streaming)
+                tracer.end(turn.outcome)
+                outcomes[turn.outcome] = outcomes.get(turn.outcome, 0) + 1
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+            bot.memory.flush()
+            results.append({"history_lines":lines, "facts":args.facts, "turns":args.turns, "startup_s":round(startup, 3),
+                            "turns_per_s":round(args.turns / elapsed, 2), "py_peak_mb":round(peak / 2**20, 1),
+                            "rss_peak_mb":round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                            "outcomes":outcomes, "stages":tracer.summary()})
+    for r in results:
+        print(f"\nhistory {r['history_lines']:,} lines · {r['facts']} facts · {r['turns']} turns: "
+              f"{r['turns_per_s']} turns/s · python peak {r['py_peak_mb']} MB · rss peak {r['rss_peak_mb']} MB · {r['outcomes']}")
+        for name, s in r["stages"].items():
+            print(f"  {name:>8}  p50 {s['p50']:>9.2f}ms  p95 {s['p95']:>9.2f}ms  n={s['n']}" + (f"  errors={s['errors']}" if s["errors"] else ""))
+    if args.json: Path(args.json).write_text(json.dumps(results, indent=2))
+
+# ── users ────────────────────────────────────────────────────────────────────
+def bench_users(args):
+    """Concurrent sessions, each on its own thread: one namespace per user vs all in one."""
+    from concurrent.futures import ThreadPoolExecutor
+    from backends import FakeSTT, FakeLLM, FakeTTS
+    from services import Services
+    from storage import user_dir
+    from tracing import Tracer, percentile
+    from companion import CompanionPool
+    wav = speech_wav()
+    for users in args.users:
+        for mode in ("shared", "per-user"):
+            with tempfile.TemporaryDirectory() as d:
+                names = [f"u{i}" for i in range(users)] if mode == "per-user" else ["everyone"]
+                for name in names: make_data(user_dir(d, name), args.history * users // len(names), 50)   # same total data
+                svc = Services(FakeSTT(E2E_TRANSCRIPTS, delay=args.delay), FakeLLM("Stand tall. Keep building, my friend.", first_token=args.delay, per_token=0.001),
+                               FakeTTS(base=args.delay, per_char=0))
+                tracer = Tracer(Path(d) / "metrics.jsonl")
+                pool = CompanionPool(d, svc, tracer, max_open=args.max_open, recall_bytes=args.recall_kb << 10, **NO_ROTATION)
+                def session(i):
+                    times = []
+                    for _ in range(args.turns + 1):               # the first turn loads the user: cold
+                        t = time.perf_counter(); tracer.begin()
+                        tracer.end(pool.get(names[i % len(names)]).turn(wav).outcome)
+                        times.append(time.perf_counter() - t)
+                    return times
+                t0 = time.perf_counter()
+                with ThreadPoolExecutor(users) as ex: runs = list(ex.map(session, range(users)))
+                elapsed = time.perf_counter() - t0
+                loaded, indexed = len(pool), sum(len(c.index.docs) for c in pool._open.values())
+                pool.close()
+                cold, warm = sorted(r[0] for r in runs), sorted(x for r in runs for x in r[1:])
+                print(f"{users:>4} users {mode:>8}: {users*(args.turns+1)/elapsed:7.1f} turns/s · cold p50 {percentile(cold,.5)*1000:6.0f}ms · "
+                      f"warm p50 {percentile(warm,.5)*1000:5.0f}ms p95 {percentile(warm,.95)*1000:5.0f}ms · "
+                      f"{loaded} loaded, {indexed:,} snippets indexed")
+
+# ── wake ─────────────────────────────────────────────────────────────────────
+def bench_wake(args):
+    """First real request of a freshly loaded user: cold, vs after a bare wake word."""
+    from backends import FakeSTT, FakeLLM, FakeTTS
+    from services import Services
+    from storage import user_dir
+    from tracing import Tracer
+    from companion import CompanionPool
+    wav = speech_wav()
+    for label, first in (("cold", "Hey Optimuz what should I build next?"), ("after wake", "hey optimuz")):
+        with tempfile.TemporaryDirectory() as d:
+            make_data(user_dir(d, "u"), args.history, 50)
+            svc = Services(FakeSTT([first, "What should I build next?"], delay=0.02),
+                           FakeLLM("Stand tall.", first_token=0.02, per_token=0.001), FakeTTS(base=0.02, per_char=0))
+            tracer = Tracer(Path(d) / "metrics.jsonl")
+            pool = CompanionPool(d, svc, tracer, **NO_ROTATION)
+            runs = []
+            for _ in range(2):
+                tracer.begin()
+                turn = pool.get("u").turn(wav)
+                runs.append((turn.outcome, {s["stage"]:s["ms"] for s in tracer.end(turn.outcome)["stages"]}))
+                time.sleep(args.pause)                            # the user speaking their request
+            outcome, st = runs[0] if runs[0][0] == "ok" else runs[1]
+            print(f"{label:>10}: first request turn {st['turn']:7.1f}ms · prompt {st['prompt']:7.1f}ms"
+                  + (f" · wake turn {runs[0][1]['turn']:.1f}ms" if runs[0][0] == "wake" else ""))
+            pool.close()
+
+# ── archive ──────────────────────────────────────────────────────────────────
+def bench_archive(args):
+    """Disk use and mood-report scan time: one history.jsonl vs rotated, compacted segments."""
+    import numpy as np
+    from datetime import datetime, timedelta
+    from collections import Counter
+    from storage import HistoryStore, tail_lines
+    texts, emotions = utterances(5_000), ["neutral","happy","sad","anxious","tired","angry","motivated"]
+    start = datetime.now() - timedelta(days=args.days)
+    step = timedelta(days=args.days) / args.lines
+    with tempfile.TemporaryDirectory() as d:
+        legacy, store = Path(d) / "legacy.jsonl", HistoryStore(Path(d) / "history.jsonl", args.segment_mb << 20, 0)
+        with open(legacy, "w", encoding="utf-8") as f:
+            for i in range(args.lines):
+                f.write(json.dumps({"ts":(start + i * step).isoformat(),"role":("user","assistant")[i % 2],
+                                    "content":texts[i % len(texts)],"emotion":emotions[i % 7 if i % 3 else 0]}, ensure_ascii=False) + "\n")
+        t = time.perf_counter()                       # split into segments as append() would have rotated them
+        with open(legacy, "rb") as f:
+            out, size = None, 0
+            for line in f:
+                if out is None or size >= store.segment_bytes:
+                    if out: out.close()
+                    ts = datetime.fromisoformat(json.loads(line)["ts"])
+                    out, size = open(store.path.with_name(f"history-{ts:%Y%m%dT%H%M%S%f}.jsonl"), "wb"), 0
+                out.write(line); size += len(line)
+            out.close()
+        for seg in store.segments():                  # name = end time, as rotation does
+            last = json.loads(tail_lines(seg, 1)[0])["ts"]
+            seg.rename(seg.with_name(f"history-{datetime.fromisoformat(last):%Y%m%dT%H%M%S%f}.jsonl"))
+        store.compact()
+        print(f"compaction: {time.perf_counter() - t:.1f}s for {args.lines:,} lines")
+        print(f"disk: jsonl {legacy.stat().st_size/1e6:8.1f} MB · segments+archives {store.usage()[1]/1e6:8.1f} MB ({store.usage()[0]} files)")
+        since = datetime.now() - timedelta(days=30)
+        def legacy_moods():
+            c = Counter()
+            with open(legacy, "rb") as f:
+                for line in f:
+                    r = json.loads(line)
+                    if r["ts"] >= since.isoformat(): c[r["emotion"]] += 1
+            return c
+        def archive_moods():
+            c = Counter()
+            for b in store.batches(("emotion",), since=since):
+                v, n = np.unique(b["emotion"], return_counts=True); c.update(dict(zip(v.tolist(), n.tolist())))
+            return c
+        def archive_all():
+            return sum(len(b["emotion"]) for b in store.batches(("emotion",)))
+        assert legacy_moods() == archive_moods()
+        for name, fn in (("jsonl scan, last 30 days", legacy_moods), ("archive, last 30 days", archive_moods),
+                         ("archive, all time", archive_all)):
+            print(f"mood report {name:>25}: {timeit(fn, 3)*1000:9.1f} ms")
+
+# ── replies ──────────────────────────────────────────────────────────────────
+REPEATED = ["Thank you!", "Good night Optimuz.", "Hey Optimuz, what's up?", "thanks", "I'm back."]
+
+def bench_replies(args):
+    """Turns over a traffic mix with a share of repeated short utterances, with and without the reply cache.
+    The LLM stand-in words each reply differently, as sampling does, so the hit rate is what production would see."""
+    import random
+    from backends import FakeSTT, FakeLLM, FakeTTS
+    from services import Services
+    from tracing import Tracer, percentile
+    from cache import ReplyCache
+    from companion import CompanionPool
+    rng, other = random.Random(3), E2E_TRANSCRIPTS
+    traffic = [rng.choice(REPEATED) if rng.random() < args.repeat_share else rng.choice(other) for _ in range(args.turns)]
+    wav = speech_wav()
+    for label, replies in (("no cache", None), ("reply cache", ReplyCache(pool_size=args.pool))):
+        with tempfile.TemporaryDirectory() as d:
+            svc = Services(FakeSTT(traffic, delay=0.01), FakeLLM(first_token=args.first_token, per_token=args.per_token, vary=True),
+                           FakeTTS(base=args.tts_base, per_char=args.tts_per_char))
+            tracer = Tracer(Path(d) / "metrics.jsonl")
+            pool = CompanionPool(d, svc, tracer, replies=replies, **NO_ROTATION)
+            times = []
+            for _ in traffic:
+                tracer.begin()
+                turn = pool.get("u").turn(wav)
+                times.append(tracer.end(turn.outcome)["stages"][-1]["ms"])
+            pool.close()
+            times.sort()
+            line = f"{label:>12}: turn p50 {percentile(times,.5):7.1f}ms p95 {percentile(times,.95):7.1f}ms · mean {sum(times)/len(times):7.1f}ms"
+            if replies: line += " · hit rate {hit_rate:.0%} ({hits} hits, {misses} misses, {skipped} not cacheable)".format(**replies.stats())
+            print(line)
+
+# ── render ───────────────────────────────────────────────────────────────────
+def legacy_chat_html(messages):
+    rows = ""
+    for m in messages[-16:]:
+        content = m["content"].replace("<","&lt;").replace(">","&gt;")
+        if m["role"] == "user":
+            rows += f"<div class='msg-anim' style='display:flex;justify-content:flex-end;margin:5px 0'><div style='max-width:80%;background:linear-gradient(135deg,rgba(20,60,120,0.75),rgba(10,30,65,0.65));border:1px solid rgba(50,110,200,0.25);border-radius:16px 16px 3px 16px;padding:9px 14px;font-family:Exo 2,sans-serif;font-size:clamp(12px,3vw,14px);color:#8bbfe0;line-height:1.5'>{content}</div></div>"
+        else:
+            rows += f"<div class='msg-anim' style='display:flex;justify-content:flex-start;margin:5px 0'><div style='max-width:80%;background:rgba(8,18,32,0.9);border:1px solid rgba(40,90,150,0.2);border-radius:16px 16px 16px 3px;padding:9px 14px;font-family:Exo 2,sans-serif;font-size:clamp(12px,3vw,14px);color:#7aaec8;line-height:1.5'>{content}</div></div>"
+    return f"<div style='max-height:260px;overflow-y:auto;padding-right:4px'>{rows}</div>"
+
+class _Slot:
+    def __init__(self): self.sent = 0
+    def markdown(self, body, **kw): self.sent += len(body.encode())
+
+def bench_render(args):
+    """Chat log build time and bytes per rerun, and orb bytes per turn."""
+    from render import chat_html, OrbView
+    texts = utterances(args.messages)
+    messages = [{"id":f"{i:08x}","role":("user","assistant")[i % 2],"content":t} for i, t in enumerate(texts)]
+    for name, fn in (("legacy", legacy_chat_html), ("classes+memo", chat_html)):
+        fn(messages)
+        t = timeit(lambda: fn(messages), args.repeat)
+        print(f"chat {name:>12}: {t*1e6:8.1f} µs/rerun · {len(fn(messages).encode()):,} bytes")
+    orb, status = _Slot(), _Slot()
+    view = OrbView(orb, status)
+    for step in [("idle","Tap the mic and speak!",""), ("thinking","Transcribing your voice...",""),
+                 ("listening","Got it!","I love building robots"), ("thinking","OPTIMUZ is thinking...",""),
+                 ("speaking","Stand tall, my friend.",""), ("speaking","Stand tall, my friend.",""),
+                 ("speaking","Keep building.",""), ("idle","Tap the mic and speak!","")]:
+        view.update(*step, name="Sam")
+    print(f"orb per turn (8 updates): {orb.sent + status.sent:,} bytes (orb {orb.sent:,} · status {status.sent:,})")
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description=__doc__)
+    sub = p.add_subparsers(dest="cmd", required=True)
+    h = sub.add_parser("history", help="last-N history reads vs file size")
+    h.add_argument("--sizes", type=int, nargs="+", default=[1_000,10_000,100_000,1_000_000,10_000_000])
+    h.add_argument("--n", type=int, default=14)
+    h.add_argument("--full-max", type=int, default=1_000_000, help="largest file to time the old full read on")
+    h.set_defaults(fn=bench_history)
+    s = sub.add_parser("stream", help="time to first audio, full reply vs sentence streaming (fake backends)")
+    s.add_argument("--first-token", type=float, default=0.35)
+    s.add_argument("--per-token", type=float, default=0.03)
+    s.add_argument("--tts-base", type=float, default=0.15)
+    s.add_argument("--tts-per-char", type=float, default=0.004)
+    s.set_defaults(fn=bench_stream)
+    a = sub.add_parser("audio", help="per-turn audio I/O wall time and allocations, before/after")
+    a.add_argument("--wav-kb", type=int, default=320, help="~10 s of 16 kHz mono PCM")
+    a.add_argument("--mp3-kb", type=int, default=60, help="~10 s of 48 kbit/s MP3")
+    a.set_defaults(fn=bench_audio)
+    v = sub.add_parser("services", help="per-call loop overhead, fresh vs persistent")
+    v.add_argument("--repeat", type=int, default=200)
+    v.set_defaults(fn=bench_services)
+    z = sub.add_parser("analyzers", help="emotion/wake/fact/name throughput, legacy scans vs single pass")
+    z.add_argument("--n", type=int, default=20_000)
+    z.add_argument("--repeat", type=int, default=3)
+    z.set_defaults(fn=bench_analyzers)
+    r = sub.add_parser("recall", help="BM25 recall index build time and search latency vs history size")
+    r.add_argument("--sizes", type=int, nargs="+", default=[1_000,10_000,100_000])
+    r.add_argument("--vocab", type=int, default=20_000)
+    r.add_argument("--budget-ms", type=float, default=10.0)
+    r.set_defaults(fn=bench_recall)
+    e = sub.add_parser("e2e", help="full turns through Companion with offline STT/LLM/TTS, per data size")
+    e.add_argument("--sizes", type=int, nargs="+", default=[1_000,10_000,100_000], help="history.jsonl lines")
+    e.add_argument("--facts", type=int, default=500)
+    e.add_argument("--turns", type=int, default=20)
+    e.add_argument("--no-streaming", action="store_true")
+    e.add_argument("--tts-cache", action="store_true")
+    e.add_argument("--stt-delay", type=float, default=0.05)
+    e.add_argument("--first-token", type=float, default=0.05)
+    e.add_argument("--per-token", type=float, default=0.005)
+    e.add_argument("--reply-sentences", type=int, default=3)
+    e.add_argument("--tts-base", type=float, default=0.02)
+    e.add_argument("--tts-per-char", type=float, default=0.0005)
+    e.add_argument("--json", help="also write results here, for comparing runs")
+    e.set_defaults(fn=bench_e2e)
+    u = sub.add_parser("users", help="concurrent sessions, shared namespace vs one per user")
+    u.add_argument("--users", type=int, nargs="+", default=[1,8,32])
+    u.add_argument("--turns", type=int, default=5, help="per user")
+    u.add_argument("--history", type=int, default=2_000, help="history.jsonl lines per user")
+    u.add_argument("--max-open", type=int, default=64)
+    u.add_argument("--recall-kb", type=int, default=256)
+    u.add_argument("--delay", type=float, default=0.02, help="fake STT/LLM/TTS latency")
+    u.set_defaults(fn=bench_users)
+    w = sub.add_parser("wake", help="first request latency, cold vs after a bare wake word")
+    w.add_argument("--history", type=int, default=20_000)
+    w.add_argument("--pause", type=float, default=1.5, help="seconds between the wake word and the request")
+    w.set_defaults(fn=bench_wake)
+    c = sub.add_parser("archive", help="history disk use and mood-report scan time, flat JSONL vs compacted segments")
+    c.add_argument("--lines", type=int, default=1_000_000)
+    c.add_argument("--days", type=int, default=365)
+    c.add_argument("--segment-mb", type=int, default=4)
+    c.set_defaults(fn=bench_archive)
+    q = sub.add_parser("replies", help="turn latency over a mix of repeated short utterances, with and without the reply cache")
+    q.add_argument("--turns", type=int, default=200)
+    q.add_argument("--repeat-share", type=float, default=0.4)
+    q.add_argument("--pool", type=int, default=3)
+    q.add_argument("--first-token", type=float, default=0.1)
+    q.add_argument("--per-token", type=float, default=0.005)
+    q.add_argument("--tts-base", type=float, default=0.05)
+    q.add_argument("--tts-per-char", type=float, default=0.0005)
+    q.set_defaults(fn=bench_replies)
+    d = sub.add_parser("render", help="chat log build time and payload per rerun, orb payload per turn")
+    d.add_argument("--messages", type=int, default=200)
+    d.add_argument("--repeat", type=int, default=2000)
+    d.set_defaults(fn=bench_render)
+    args = p.parse_args(argv)
+    args.fn(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
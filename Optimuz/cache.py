@@ -0,0 +1,135 @@
+"""OPTIMUZ caches - content-addressed TTS audio on disk with LRU eviction, spoken replies to repeated utterances"""
+
+import os, re, json, time, random, hashlib, threading
+from pathlib import Path
+from collections import OrderedDict
+from backends import clean_for_speech
+from storage import atomic_write
+
+class AudioCache:
+    """One file per key under root; least recently used files are evicted once
+    the total passes max_bytes. Recency survives restarts via file mtimes."""
+
+    def __init__(self, root, max_bytes=64 << 20, suffix=".mp3"):
+        self.root, self.max_bytes, self.suffix = Path(root), max_bytes, suffix
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.hits = self.misses = self.bytes = 0
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()                # key -> size, oldest first
+        files = sorted((p.stat().st_mtime, p) for p in self.root.glob("*" + suffix))
+        for _, p in files:
+            self._lru[p.stem] = size = p.stat().st_size
+            self.bytes += size
+        self._evict()
+
+    @staticmethod
+    def key(*parts): return hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+    def _path(self, key): return self.root / (key + self.suffix)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                if key in self._lru: self.bytes -= self._lru.pop(key)   # evicted by another process
+            return None
+        with self._lock:
+            self.hits += 1
+            if key not in self._lru: self.bytes += len(data)           # written by another process
+            self._lru[key] = len(data); self._lru.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        atomic_write(self._path(key), data)
+        with self._lock:
+            self.bytes += len(data) - self._lru.pop(key, 0)
+            self._lru[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and len(self._lru) > 1:
+            key, size = self._lru.popitem(last=False)
+            self.bytes -= size
+            try: self._path(key).unlink()
+            except FileNotFoundError: pass
+
+    def stats(self): return {"hits":self.hits,"misses":self.misses,"entries":len(self._lru),"bytes":self.bytes}
+
+
+class CachedTTS:
+    """TTS backend wrapper: a hit returns stored audio without calling the backend."""
+
+    def __init__(self, tts, cache): self.tts, self.cache = tts, cache
+
+    def __getattr__(self, name): return getattr(self.tts, name)
+
+    def key(self, text):
+        p = getattr(self.tts, "prosody", {})
+        return self.cache.key(clean_for_speech(text), getattr(self.tts, "voice", ""), p.get("rate"), p.get("pitch"), p.get("volume"))
+
+    async def synthesize(self, text):
+        k = self.key(text)
+        if (data := self.cache.get(k)) is not None: return data
+        data = await self.tts.synthesize(text)
+        if data: self.cache.put(k, data)
+        return data
+
+
+_PUNCT = re.compile(r"[^\w\s]")
+_ADDRESS = {"optimuz", "opti"}                   # "good night optimuz" is still "good night"
+SMALL_TALK = frozenset("""thank you|thanks|thank you so much|thanks a lot|thank you very much|good night|goodnight|
+good morning|good evening|good afternoon|hello|hi|hey|whats up|how are you|how are you doing|im back|bye|goodbye|
+see you|see you later|see you tomorrow""".replace("\n", "").split("|"))
+
+def normalize(text): return " ".join(w for w in _PUNCT.sub("", text.lower()).split() if w not in _ADDRESS)
+
+class ReplyCache:
+    """Spoken replies to small talk people repeat ("thank you", "good night").
+    Only SMALL_TALK phrases are cached: anything else ("yes", "why?") means
+    something different in each conversation. The key is the user, the
+    normalized phrase, the emotion and a hash of the user's name and recent
+    facts. Each key keeps up to pool_size replies as [(sentence, mp3), ...];
+    get() serves a random one with probability fill/pool_size, so the pool
+    fills with variations before answers repeat. Replies expire after ttl
+    seconds; past max_keys the LRU key is dropped."""
+
+    def __init__(self, ttl=6 * 3600, max_keys=256, pool_size=3, phrases=SMALL_TALK):
+        self.ttl, self.max_keys, self.pool_size, self.phrases = ttl, max_keys, pool_size, phrases
+        self.hits = self.misses = self.skipped = 0
+        self._lock = threading.Lock()
+        self._pools = OrderedDict()              # key -> [(stored at, parts)], least recently used first
+
+    def key(self, user, text, emotion, memory):
+        """None unless the utterance is a small-talk phrase."""
+        norm = normalize(text)
+        if norm not in self.phrases:
+            self.skipped += 1; return None
+        ctx = json.dumps([memory.get("name"), memory.get("facts", [])[-10:]], ensure_ascii=False)
+        return AudioCache.key(user, norm, emotion, hashlib.sha256(ctx.encode("utf-8")).hexdigest()[:16])
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            pool = [e for e in self._pools.get(key, ()) if now - e[0] < self.ttl]
+            if pool: self._pools[key] = pool; self._pools.move_to_end(key)
+            else: self._pools.pop(key, None)
+            if pool and random.random() < len(pool) / self.pool_size:
+                self.hits += 1; return random.choice(pool)[1]
+            self.misses += 1; return None
+
+    def put(self, key, parts):
+        with self._lock:
+            pool = self._pools.setdefault(key, [])
+            pool.append((time.monotonic(), list(parts)))
+            del pool[:-self.pool_size]
+            self._pools.move_to_end(key)
+            while len(self._pools) > self.max_keys: self._pools.popitem(last=False)
+
+    def stats(self):
+        looked = self.hits + self.misses
+        return {"hits":self.hits, "misses":self.misses, "skipped":self.skipped, "keys":len(self._pools),
+                "hit_rate":self.hits / looked if looked else 0.0}
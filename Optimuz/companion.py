@@ -0,0 +1,227 @@
+"""OPTIMUZ companion - one conversational turn, without the UI"""
+
+import time, threading
+from pathlib import Path
+from datetime import datetime
+from collections import namedtuple, OrderedDict
+from storage import HistoryStore, MemoryStore, empty_memory, user_dir
+from analyzers import TextAnalyzer
+from prompt import PromptBuilder
+from retrieval import MemoryIndex
+from audio import prepare_for_stt
+from pipeline import speak_stream, iter_sync
+
+Turn = namedtuple("Turn", "outcome transcript text emotion reply memory prompt_stats vad")
+ACK_TEXT = "I'm listening."                      # spoken on a bare wake word
+
+# outcome -> (orb state, status line)
+STATUS = {
+    "ok":               ("idle","Tap the mic and speak!"),
+    "no_speech":        ("idle","Couldn't hear that. Try again."),
+    "stt_error":        ("idle","Error. Try again."),
+    "empty_transcript": ("idle","Couldn't hear that. Try again."),
+    "wake":             ("wake","Wake word heard! Speak your message..."),
+    "llm_error":        ("idle","AI error. Try again."),
+}
+
+def _short(s): return s[:70]+"..." if len(s)>70 else s
+
+class Companion:
+    """Stores, analyzers, prompt builder and services for one data directory.
+    Streamlit and the offline benchmarks drive the same turn() through
+    on_status(state, status, transcript) and on_audio(text, mp3 | None).
+    Stages are recorded on whatever turn the tracer has open."""
+
+    def __init__(self, data_dir, services, tracer, prompt_budget=1500, facts_max=2000,
+                 recall_bytes=8 << 20, analyzer=None, ack=None, segment_bytes=4 << 20, segment_days=7, keep_days=0,
+                 replies=None):
+        self.data_dir = Path(data_dir); self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.history  = HistoryStore(self.data_dir / "history.jsonl", segment_bytes, segment_days, keep_days)
+        self.memory   = MemoryStore(self.data_dir / "memory.json")
+        self.index    = MemoryIndex(self.data_dir / "history.jsonl", initial_bytes=recall_bytes)
+        self.analyzer = analyzer or TextAnalyzer()
+        self.prompt   = PromptBuilder(prompt_budget)
+        self.svc, self.tracer, self.facts_max, self.replies = services, tracer, facts_max, replies   # ReplyCache or None
+        self.ack = ack or services.submit(services.synthesize(ACK_TEXT))   # Future of the wake clip
+
+    # ── memory / history ─────────────────────────────────────────────────────
+    def load_memory(self): return self.memory.get()
+
+    def clear_memory(self): return self.memory.replace(empty_memory())
+
+    def clear_history(self): self.history.clear()
+
+    def close(self): self.memory.close()
+
+    def update_memory(self, text, a):
+        """text: the utterance to remember; a: its TextAnalyzer result."""
+        now, emotion, facts_max = datetime.now().isoformat(), a.emotion, self.facts_max
+        fact = text.strip() if a.facts and len(text)<250 else None
+        def apply(m):
+            m["last_seen"] = now
+            if a.name and not m.get("name"): m["name"] = a.name
+            if emotion != "neutral":
+                m.setdefault("mood_history",[]).append({"emotion":emotion,"ts":now[:10]})
+                if len(m["mood_history"])>20: m["mood_history"]=m["mood_history"][-20:]
+            if fact and fact not in m.setdefault("facts",[]):
+                m["facts"].append(fact)
+                if len(m["facts"])>facts_max: m["facts"]=m["facts"][-facts_max:]
+        return self.memory.update(apply)
+
+    def recall(self, message, memory, history, k=3):
+        """Older history turns and facts relevant to message, excluding what the prompt already has."""
+        facts = memory.get("facts", [])
+        self.index.sync(facts)
+        seen = {h["content"] for h in history} | set(facts[-10:]) | {message}
+        return [text for _, _, text in self.index.search(message, k, exclude=seen, facts=facts)]
+
+    def build_messages(self, message, memory, emotion):
+        """(msgs, prompt stats)"""
+        with self.tracer.stage("prompt") as rec:
+            history = self.history.recent(14)
+            msgs, ps = self.prompt.build(message, memory, emotion, history, self.recall(message, memory, history))
+            rec.update(tokens=ps["total"], turns=ps["turns"], recalled=ps["recalled"])
+        return msgs, ps
+
+    # ── backends ─────────────────────────────────────────────────────────────
+    def transcribe(self, audio_bytes):
+        with self.tracer.stage("stt", bytes_in=len(audio_bytes)) as rec:
+            text = self.svc.run(self.svc.transcribe(audio_bytes)); rec["chars_out"] = len(text)
+        return text
+
+    def ask(self, msgs):
+        with self.tracer.stage("llm") as rec:
+            reply = self.svc.run(self.svc.chat(msgs)); rec["chars_out"] = len(reply)
+        return reply
+
+    def speak(self, text):
+        with self.tracer.stage("tts", chars_in=len(text)) as rec:
+            audio = self.svc.run(self.svc.synthesize(text)); rec["bytes_out"] = len(audio)
+        return audio
+
+    def stream(self, msgs, on_status, on_audio):
+        """Speak the reply sentence by sentence while the LLM is still generating; returns the text."""
+        parts = []
+        with self.tracer.stage("reply", bytes_out=0) as rec:
+            t0 = time.perf_counter()
+            for sentence, audio in iter_sync(speak_stream(self.svc, self.svc, msgs), self.svc.loop):
+                if not parts:
+                    rec["first_audio_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+                    on_status("speaking", _short(sentence), "")
+                parts.append(sentence)
+                rec["bytes_out"] += len(audio or b"")
+                on_audio(sentence, audio)
+            rec["sentences"] = len(parts)
+        return " ".join(parts)
+
+    def replay(self, parts, on_status, on_audio):
+        """Speak a cached reply; returns its text."""
+        with self.tracer.stage("reply", cached=True, sentences=len(parts)) as rec:
+            on_status("speaking", _short(parts[0][0]), "")
+            for sentence, audio in parts: on_audio(sentence, audio)
+            rec["bytes_out"] = sum(len(a or b"") for _, a in parts)
+        return " ".join(s for s, _ in parts)
+
+    def acknowledge(self, on_audio):
+        """Play the pre-synthesized wake clip; skipped if it isn't ready or failed."""
+        try: audio = self.ack.result(timeout=0.5)
+        except Exception:
+            if self.ack.done(): self.ack = self.svc.submit(self.svc.synthesize(ACK_TEXT))   # try again next time
+            return
+        on_audio(ACK_TEXT, audio)
+
+    def prepare(self):
+        """After a bare wake word the next utterance is the real request. Open
+        backend connections and bring memory and the recall index up to date
+        on a background thread while the user talks, so that turn starts warm
+        (its recall waits on the index lock if this is still running)."""
+        def warm():
+            self.index.sync(self.memory.get().get("facts", []))
+        self.svc.submit(self.svc.warm())
+        threading.Thread(target=warm, name="optimuz-prepare", daemon=True).start()
+
+    # ── one turn ─────────────────────────────────────────────────────────────
+    def turn(self, audio_bytes, streaming=True, on_status=lambda *a: None, on_audio=lambda *a: None):
+        """Mic audio in, spoken reply out. Never raises for backend failures;
+        the outcome (a STATUS key) says where the turn stopped."""
+        def done(outcome, **kw):
+            on_status(*STATUS[outcome], "")
+            return Turn(**{**dict.fromkeys(Turn._fields), "outcome":outcome, **kw})
+        try:
+            with self.tracer.stage("vad", bytes_in=len(audio_bytes)) as rec:
+                clip, vad = prepare_for_stt(audio_bytes)
+                rec["bytes_out"] = len(clip or b"")
+        except Exception:
+            clip, vad = audio_bytes, None
+        if clip is None: return done("no_speech", vad=vad)
+
+        on_status("thinking","Transcribing your voice...","")
+        try: transcript = self.transcribe(clip)
+        except Exception: return done("stt_error", vad=vad)
+        if not transcript or len(transcript.strip()) < 2: return done("empty_transcript", vad=vad)
+
+        with self.tracer.stage("analyze", chars_in=len(transcript)):
+            a = self.analyzer.analyze(transcript)
+        if a.wake and not a.clean.strip():
+            on_status(*STATUS["wake"], "")
+            self.acknowledge(on_audio)
+            self.prepare()
+            return done("wake", transcript=transcript, vad=vad)
+
+        text = a.clean
+        with self.tracer.stage("memory"):
+            memory = self.update_memory(text, a)
+            self.history.append("user", text, a.emotion)
+        on_status("listening","Got it!", text)
+
+        key = self.replies and self.replies.key(str(self.data_dir), text, a.emotion, memory)
+        if key and (parts := self.replies.get(key)):
+            reply = self.replay(parts, on_status, on_audio)
+            with self.tracer.stage("memory"): self.history.append("assistant", reply)
+            return done("ok", transcript=transcript, text=text, emotion=a.emotion, reply=reply, memory=memory, vad=vad)
+
+        spoken = []
+        def record(sentence, audio): spoken.append((sentence, audio)); on_audio(sentence, audio)
+
+        on_status("thinking","OPTIMUZ is thinking...","")
+        msgs, ps = self.build_messages(text, memory, a.emotion)
+        try: reply = self.stream(msgs, on_status, record) if streaming else self.ask(msgs)
+        except Exception:
+            return done("llm_error", transcript=transcript, text=text, emotion=a.emotion, memory=memory, prompt_stats=ps, vad=vad)
+        with self.tracer.stage("memory"): self.history.append("assistant", reply)
+
+        if not streaming:
+            on_status("speaking", _short(reply), "")
+            try: audio = self.speak(reply)
+            except Exception: audio = None
+            record(reply, audio)
+        if key and spoken and all(audio for _, audio in spoken): self.replies.put(key, spoken)
+        return done("ok", transcript=transcript, text=text, emotion=a.emotion, reply=reply, memory=memory, prompt_stats=ps, vad=vad)
+
+class CompanionPool:
+    """One Companion per user, each in its own user_dir() under root, so
+    sessions never share memory.json or history.jsonl. At most max_open are
+    loaded at once; the least recently used is flushed and dropped, and is
+    rebuilt from disk when its user comes back. Services, tracer, the
+    text analyzer and the wake clip are shared."""
+
+    def __init__(self, root, services, tracer, max_open=64, **kw):
+        self.root, self.svc, self.tracer, self.max_open = Path(root), services, tracer, max_open
+        self.kw = {"analyzer":TextAnalyzer(), "ack":services.submit(services.synthesize(ACK_TEXT)), **kw}
+        self._open, self._lock = OrderedDict(), threading.Lock()
+
+    def get(self, user):
+        with self._lock:
+            if user in self._open:
+                self._open.move_to_end(user); return self._open[user]
+            evicted = []
+            while len(self._open) >= self.max_open: evicted.append(self._open.popitem(last=False)[1])
+            c = self._open[user] = Companion(user_dir(self.root, user), self.svc, self.tracer, **self.kw)
+        for old in evicted: old.close()
+        return c
+
+    def close(self):
+        with self._lock: open_, self._open = list(self._open.values()), OrderedDict()
+        for c in open_: c.close()
+
+    def __len__(self): return len(self._open)
@@ -0,0 +1,62 @@
+"""OPTIMUZ pipeline - stream LLM tokens into per-sentence TTS"""
+
+import re, queue, asyncio, threading
+
+# sentence end: terminal punctuation (+ closing quotes/brackets) followed by whitespace
+_BOUNDARY = re.compile(r"[.!?…。！？؟]+[\"'”’)\]]*\s+|\n+")
+
+def mp3_seconds(data, bitrate=48_000):
+    """Playback length of a CBR MP3 (edge-tts emits 48 kbit/s mono)."""
+    return len(data) * 8 / bitrate
+
+async def sentences(tokens, min_chars=12):
+    """Group an async token stream into sentences of at least min_chars."""
+    buf = ""
+    async for tok in tokens:
+        buf += tok
+        while m := next((m for m in _BOUNDARY.finditer(buf) if m.end() >= min_chars), None):
+            s, buf = buf[:m.end()].strip(), buf[m.end():]
+            if s: yield s
+    if buf.strip(): yield buf.strip()
+
+async def speak_stream(llm, tts, msgs, min_chars=12):
+    """Yield (sentence, mp3 bytes | None) in order while the LLM is still generating.
+    Synthesis of each sentence starts as soon as it is complete; a failed
+    synthesis yields None so the caller can fall back to text."""
+    q, tasks = asyncio.Queue(), []
+
+    async def produce():
+        try:
+            async for s in sentences(llm.stream(msgs), min_chars):
+                tasks.append(asyncio.ensure_future(tts.synthesize(s)))
+                await q.put((s, tasks[-1]))
+        finally:
+            await q.put(None)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while (item := await q.get()) is not None:
+            s, task = item
+            try: audio = await task
+            except Exception: audio = None
+            yield s, audio
+        await producer                           # re-raise LLM errors
+    finally:
+        producer.cancel()
+        for t in tasks: t.cancel()
+
+def iter_sync(agen, loop=None):
+    """Drive an async generator on loop (or a fresh worker thread) and yield its items here."""
+    q = queue.Queue()
+    async def pump():
+        try:
+            async for item in agen: q.put((True, item))
+        except BaseException as e: q.put((False, e))
+        else: q.put((False, None))
+    if loop: asyncio.run_coroutine_threadsafe(pump(), loop)
+    else: threading.Thread(target=asyncio.run, args=(pump(),), daemon=True).start()
+    while True:
+        ok, val = q.get()
+        if ok: yield val
+        elif val is None: return
+        else: raise val
@@ -0,0 +1,91 @@
+"""OPTIMUZ prompt - system prompt with a fixed persona prefix, history trimmed to a token budget"""
+
+import re
+from functools import lru_cache
+
+PERSONA = """You are OPTIMUZ — a powerful AI companion inspired by Optimus Prime. Strong, wise, loyal, deeply caring.
+
+CRITICAL — spoken aloud:
+- 1-3 sentences MAX. Short and powerful.
+- NO bullet points, NO markdown, NO asterisks.
+- Calm authority + warmth, like Optimus Prime.
+- Auto-detect language and reply in same language.
+- Never robotic. Always genuine and present."""
+
+EMOTION_GUIDE = {
+    "sad":"Lead with empathy. Be warm and present. Don't rush to fix.",
+    "anxious":"Be calm and grounding. Speak with steady reassurance.",
+    "happy":"Match their energy! Be warm and celebratory.",
+    "angry":"Acknowledge feelings first. Don't dismiss.",
+    "tired":"Be gentle and brief. Don't overwhelm.",
+    "motivated":"Be bold and energizing!",
+}
+DEFAULT_GUIDE = "Respond naturally and warmly."
+MSG_OVERHEAD  = 4                                # role/separator tokens per chat message
+
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+def count_tokens(text):
+    """Rough BPE-style estimate with no tokenizer download: a word or
+    punctuation mark is ~1 token, long words cost one more per 6 chars."""
+    return sum(1 + len(p) // 6 for p in _PIECES.findall(text))
+
+def clip(text, max_tokens):
+    """Cut text to about max_tokens, at a word boundary."""
+    if count_tokens(text) <= max_tokens: return text
+    out, n = [], 0
+    for m in re.finditer(r"\S+\s*", text):
+        n += count_tokens(m.group())
+        if n > max_tokens: break
+        out.append(m.group())
+    return "".join(out).rstrip() + " …"
+
+def memory_context(memory):
+    ctx = ""
+    if memory.get("name"): ctx += f"User's name: {memory['name']}. Use it naturally.\n"
+    if memory.get("facts"): ctx += "Known facts:\n" + "\n".join(f"  - {f}" for f in memory["facts"][-10:]) + "\n"
+    if memory.get("mood_history"):
+        moods = [x["emotion"] for x in memory["mood_history"][-5:]]
+        ctx += f"Recent moods: {', '.join(moods)}\n"
+    return ctx
+
+@lru_cache(maxsize=256)
+def system_prompt(ctx, emotion):
+    """(text, token estimate); memoized, as ctx only changes when memory does."""
+    text = f"{PERSONA}\n\n{ctx}Emotional context: {EMOTION_GUIDE.get(emotion, DEFAULT_GUIDE)}"
+    return text, count_tokens(text) + MSG_OVERHEAD
+
+class PromptBuilder:
+    """Chat messages for one turn. The persona comes first and never changes,
+    so the provider can reuse its cached prefix; memory and mood follow.
+    History is added newest first until the token budget is spent."""
+
+    def __init__(self, budget=1500, max_turns=12, max_turn_tokens=150):
+        self.budget, self.max_turns, self.max_turn_tokens = budget, max_turns, max_turn_tokens
+
+    def build(self, message, memory, emotion, history=(), recalled=()):
+        """Return (msgs, stats); stats holds token estimates per part.
+        recalled: older snippets retrieved for this message, added to the context."""
+        ctx = memory_context(memory)
+        if recalled: ctx += "Related memories:\n" + "\n".join(f"  - {clip(r, 40)}" for r in recalled) + "\n"
+        system, sys_tokens = system_prompt(ctx, emotion)
+        left = self.budget - sys_tokens
+        turns = [h for h in history if h.get("role") in ("user","assistant")]
+        if turns and turns[-1]["role"] == "user" and turns[-1]["content"] == message:
+            turns.pop()                          # the current message, already appended to history
+        message = clip(message, max(left // 2, 32))
+        msg_tokens = count_tokens(message) + MSG_OVERHEAD
+        left -= msg_tokens
+        turns = turns[-self.max_turns:]
+        kept = []
+        for h in reversed(turns):
+            content = clip(h["content"], self.max_turn_tokens)
+            cost = count_tokens(content) + MSG_OVERHEAD
+            if cost > left: break
+            left -= cost
+            kept.append({"role":h["role"],"content":content})
+        kept.reverse()
+        msgs = [{"role":"system","content":system}, *kept, {"role":"user","content":message}]
+        hist_tokens = self.budget - sys_tokens - msg_tokens - left
+        return msgs, {"system":sys_tokens, "history":hist_tokens, "message":msg_tokens,
+                      "total":sys_tokens + hist_tokens + msg_tokens, "turns":len(kept), "dropped":len(turns) - len(kept), "recalled":len(recalled)}
@@ -0,0 +1,110 @@
+"""OPTIMUZ render - class-based orb and transmission-log HTML, memoized fragments"""
+
+import html
+from functools import lru_cache
+
+# state -> (core dark, core mid, core light, glow, animation, accent)
+ORB_STATES = {
+    "idle":      ("#0a1520","#162535","#1e3a50","rgba(30,80,140,0.3)", "orbFloat 5s ease-in-out infinite",   "#3a7abf"),
+    "listening": ("#0a1e30","#1a3d60","#2a6090","rgba(40,120,200,0.5)","orbListen 0.9s ease-in-out infinite", "#4da6ff"),
+    "thinking":  ("#150d25","#2a1845","#3d2260","rgba(80,40,160,0.45)","none",                                "#8855ee"),
+    "speaking":  ("#0a2015","#153520","#1e5030","rgba(20,140,80,0.45)","orbSpeak 0.5s ease-in-out infinite",  "#33cc77"),
+    "wake":      ("#0a2010","#155020","#209040","rgba(20,180,80,0.4)", "orbListen 0.6s ease-in-out infinite", "#22ee66"),
+}
+ORB_LABELS = {"idle":"STANDBY","listening":"LISTENING","thinking":"PROCESSING","speaking":"SPEAKING","wake":"WAKE WORD DETECTED"}
+WAVE = [8,14,22,30,22,14,8]
+
+# ── CSS (sent once per page, not per message / orb update) ────────────────────
+CSS = "<style>" + "".join(
+    f".oz-orb.s-{s}{{--c1:{c1};--c2:{c2};--c3:{c3};--glow:{glow};--anim:{anim};--dot:{dot}}}"
+    for s, (c1, c2, c3, glow, anim, dot) in ORB_STATES.items()) + "".join(
+    f".oz-wave i:nth-child({i+1}){{height:{h}px;animation-delay:{i*0.08:.2f}s}}" for i, h in enumerate(WAVE)) + """
+.oz-orb{position:relative;z-index:1}
+.oz-head{text-align:center;padding:12px 0 6px}
+.oz-title{font-family:Orbitron,monospace;font-size:clamp(30px,8vw,46px);font-weight:900;letter-spacing:clamp(5px,2vw,12px);
+  background:linear-gradient(135deg,#a8d4f8 0%,#4a90d9 30%,#c8e8ff 55%,#5ba3e8 75%,#8ec8ff 100%);background-size:200% auto;
+  -webkit-background-clip:text;background-clip:text;color:transparent;animation:titleGlow 3s ease-in-out infinite}
+.oz-sub{font-family:Orbitron,monospace;font-size:clamp(8px,2vw,10px);color:#1e3a55;text-transform:uppercase;margin-top:3px;letter-spacing:4px}
+.oz-stage{position:relative;width:clamp(180px,48vw,220px);height:clamp(180px,48vw,220px);display:flex;align-items:center;justify-content:center;margin:8px auto}
+.oz-halo{position:absolute;width:110%;height:110%;border-radius:50%;background:radial-gradient(circle,var(--glow) 0%,transparent 65%);animation:glowPulse 2.5s ease-in-out infinite}
+.oz-ring{position:absolute;width:100%;height:100%;border-radius:50%;border:1px solid rgba(0,180,255,0.12);animation:ringRot 10s linear infinite}
+.oz-ring2{position:absolute;width:85%;height:85%;border-radius:50%;border:1px solid rgba(50,120,200,0.1);animation:ringRotR 7s linear infinite}
+.oz-ring>b{position:absolute;top:-4px;left:50%;width:7px;height:7px;background:var(--dot);border-radius:50%;box-shadow:0 0 14px var(--dot)}
+.oz-ring2>b{position:absolute;bottom:-3px;left:40%;width:5px;height:5px;background:#4a90d9;border-radius:50%;box-shadow:0 0 10px #4a90d9}
+.oz-core{width:72%;height:72%;border-radius:50%;background:radial-gradient(circle at 32% 32%,var(--c3) 0%,var(--c2) 40%,var(--c1) 100%);
+  box-shadow:0 0 50px var(--glow),inset 0 0 30px rgba(0,0,0,0.6),inset 0 3px 8px rgba(255,255,255,0.06);animation:var(--anim);
+  display:flex;align-items:center;justify-content:center;position:relative;overflow:hidden;transition:all 0.6s ease}
+.oz-shine{position:absolute;top:12%;left:16%;width:38%;height:22%;border-radius:50%;background:radial-gradient(ellipse,rgba(255,255,255,0.09) 0%,transparent 100%)}
+.oz-scan{position:absolute;width:100%;height:2px;background:linear-gradient(90deg,transparent,rgba(0,220,255,0.3),transparent);animation:scanAnim 2.5s linear infinite}
+.oz-wave{display:flex;gap:4px;align-items:center}
+.oz-wave i{width:3px;background:rgba(0,255,150,0.9);border-radius:2px;animation:waveAnim 0.5s ease-in-out infinite}
+.oz-dots{display:flex;gap:7px}
+.oz-dots i{width:9px;height:9px;border-radius:50%;background:rgba(160,80,255,0.95);animation:dotBounce 1.1s ease-in-out infinite}
+.oz-dots i:nth-child(2){animation-delay:0.2s}.oz-dots i:nth-child(3){animation-delay:0.4s}
+.oz-mic{font-size:32px;filter:drop-shadow(0 0 12px rgba(0,180,255,0.9))}
+.oz-idle{font-size:32px;opacity:0.35;color:#0080cc;font-family:Orbitron,monospace}
+.oz-status{text-align:center;margin:6px 0 10px}
+.oz-label{font-family:Orbitron,monospace;font-size:clamp(8px,2vw,10px);letter-spacing:3px;text-transform:uppercase;color:var(--dot);margin-bottom:5px}
+.oz-line{font-family:Exo 2,sans-serif;font-size:clamp(13px,3.5vw,15px);color:#1e3a55;font-style:italic;min-height:20px}
+.oz-said{font-family:Exo 2,sans-serif;font-size:14px;color:#4a7090;margin:6px auto 0;padding:6px 14px;border-left:2px solid rgba(60,130,200,0.4);max-width:360px}
+.oz-loghead{font-family:Orbitron,monospace;font-size:9px;letter-spacing:3px;color:#1a3248;text-transform:uppercase;margin:12px 0 8px;padding-bottom:6px;border-bottom:1px solid rgba(0,100,150,0.12)}
+.oz-log{max-height:260px;overflow-y:auto;padding-right:4px}
+.oz-msg{display:flex;margin:5px 0}
+.oz-msg>div{max-width:80%;padding:9px 14px;font-family:Exo 2,sans-serif;font-size:clamp(12px,3vw,14px);line-height:1.5}
+.oz-msg.user{justify-content:flex-end}
+.oz-msg.user>div{background:linear-gradient(135deg,rgba(20,60,120,0.75),rgba(10,30,65,0.65));border:1px solid rgba(50,110,200,0.25);border-radius:16px 16px 3px 16px;color:#8bbfe0}
+.oz-msg.assistant{justify-content:flex-start}
+.oz-msg.assistant>div{background:rgba(8,18,32,0.9);border:1px solid rgba(40,90,150,0.2);border-radius:16px 16px 16px 3px;color:#7aaec8}
+</style>"""
+
+# ── Orb ───────────────────────────────────────────────────────────────────────
+_INNER = {
+    "speaking":  "<div class='oz-wave'>" + "<i></i>" * len(WAVE) + "</div>",
+    "listening": "<div class='oz-mic'>🎙️</div>",
+    "wake":      "<div class='oz-mic'>🎙️</div>",
+    "thinking":  "<div class='oz-dots'><i></i><i></i><i></i></div>",
+}
+_IDLE = "<div class='oz-idle'>&#8853;</div>"
+
+def _state(state): return state if state in ORB_STATES else "idle"
+
+@lru_cache(maxsize=64)
+def orb_html(state, name=""):
+    """Title and orb for one state; the status line is a separate fragment."""
+    state = _state(state)
+    subtitle = ("ONLINE &middot; " + html.escape(name.upper())) if name else "v2.0 &middot; ALWAYS READY"
+    return (f"<div class='oz-orb s-{state}'><div class='oz-head'><div class='oz-title'>OPTIMUZ</div><div class='oz-sub'>{subtitle}</div></div>"
+            "<div class='oz-stage'><div class='oz-halo'></div><div class='oz-ring'><b></b></div><div class='oz-ring2'><b></b></div>"
+            f"<div class='oz-core'><div class='oz-shine'></div><div class='oz-scan'></div>{_INNER.get(state, _IDLE)}</div></div></div>")
+
+def status_html(state, status, transcript=""):
+    said = f"<div class='oz-said'>&ldquo;{html.escape(transcript)}&rdquo;</div>" if transcript else ""
+    return (f"<div class='oz-orb oz-status s-{_state(state)}'><div class='oz-label'>&#9679; {ORB_LABELS.get(state, 'STANDBY')}</div>"
+            f"<div class='oz-line'>{html.escape(status)}</div>{said}</div>")
+
+class OrbView:
+    """Orb and status line in two Streamlit slots. update() re-sends only the
+    slot whose inputs changed, so a turn's status changes don't resend the orb."""
+
+    def __init__(self, orb_slot, status_slot):
+        self.orb_slot, self.status_slot = orb_slot, status_slot
+        self.shown = {}
+
+    def update(self, state, status="", transcript="", name=""):
+        for slot, key, build in ((self.orb_slot, (state, name), orb_html),
+                                 (self.status_slot, (state, status, transcript), status_html)):
+            if self.shown.get(id(slot)) != key:
+                slot.markdown(build(*key), unsafe_allow_html=True)
+                self.shown[id(slot)] = key
+
+# ── Transmission log ──────────────────────────────────────────────────────────
+LOG_HEAD = "<div class='oz-loghead'>&#9672; Transmission Log</div>"
+
+@lru_cache(maxsize=1024)
+def message_html(mid, role, content):
+    """One chat bubble; messages don't change once sent, so each is built once per id."""
+    role = "user" if role == "user" else "assistant"
+    return f"<div class='oz-msg {role} msg-anim' id='m-{mid}'><div>{html.escape(content, quote=False)}</div></div>"
+
+def chat_html(messages, limit=16):
+    return "<div class='oz-log'>" + "".join(message_html(m.get("id"), m["role"], m["content"]) for m in messages[-limit:]) + "</div>"
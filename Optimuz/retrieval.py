@@ -0,0 +1,131 @@
+"""OPTIMUZ retrieval - local BM25 index over history.jsonl and memory facts"""
+
+import re, math, json, time, heapq, threading
+from pathlib import Path
+from collections import Counter, defaultdict
+
+_WORD = re.compile(r"\w+")
+STOPWORDS = frozenset("""a an and are as at be but by do does did for from have has had he her him his how i i'm
+if in into is it its just me my no not of on or our she so that the their them then there they this to too
+us was we were what when where which who why will with would you your yeah ok okay hey hi hello optimuz opti""".split())
+
+def stem(w): return w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+
+def _inode(path):
+    try: return path.stat().st_ino
+    except FileNotFoundError: return None
+
+def terms(text): return [stem(w) for w in _WORD.findall(text.lower()) if w not in STOPWORDS and len(w) > 1]
+
+class MemoryIndex:
+    """BM25 over history turns and facts, kept in memory per process.
+
+    sync() picks up lines appended to history.jsonl since the last call (by
+    any process) by reading from a saved byte offset, so the index grows
+    with the file instead of being rebuilt. On first sync only the last
+    initial_bytes of history are read, going back into closed segments and
+    archives if the active file is shorter. When the file is rotated, the
+    rest of the renamed segment is read before starting on the new file."""
+
+    def __init__(self, history_path, k1=1.2, b=0.75, initial_bytes=8 << 20):
+        self.path, self.k1, self.b, self.initial_bytes = Path(history_path), k1, b, initial_bytes
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.docs, self.lens, self.total = [], [], 0       # doc id -> (kind, text)
+        self.postings = defaultdict(list)                  # term -> [(doc id, tf)]
+        self.seen, self.offset, self.ino = set(), None, None
+
+    def add(self, text, kind):
+        text = text.strip()
+        if not text or (kind, text) in self.seen: return
+        tf = Counter(terms(text))
+        if not tf: return
+        doc = len(self.docs)
+        self.docs.append((kind, text)); self.seen.add((kind, text))
+        n = sum(tf.values()); self.lens.append(n); self.total += n
+        for t, c in tf.items(): self.postings[t].append((doc, c))
+
+    def sync(self, facts=()):
+        with self._lock:
+            for f in facts: self.add(f, "fact")
+            try: st = self.path.stat(); size, ino = st.st_size, st.st_ino
+            except FileNotFoundError: size, ino = 0, None
+            if self.offset is not None and ino != self.ino:
+                rotated = next((p for p in self.path.parent.glob(f"{self.path.stem}-*{self.path.suffix}")
+                                if _inode(p) == self.ino), None) if self.ino else None
+                if rotated: self._read(rotated, rotated.stat().st_size); self.offset = 0   # finish it, start the new file
+                elif self.offset: self._reset()                                          # history cleared
+            if self.offset is not None and size < self.offset: self._reset()
+            if self.offset is None:
+                self.offset = max(0, size - self.initial_bytes)
+                if size < self.initial_bytes: self._backfill(self.initial_bytes - size)
+            self.ino = ino
+            if size > self.offset: self._read(self.path, size)
+
+    def _backfill(self, budget):
+        """First sync with a short active file (just rotated): spend the rest of
+        initial_bytes on the newest closed segments and archives."""
+        segs = sorted(p for p in self.path.parent.glob(f"{self.path.stem}-*") if p.suffix in (".jsonl", ".npz"))
+        for p in reversed(segs):
+            if budget <= 0: return
+            if p.suffix == ".jsonl" and not p.exists(): p = p.with_suffix(".npz")   # compacted since the listing
+            try:
+                if p.suffix == ".npz":
+                    from archive import read_archive
+                    cols = read_archive(p, ("role", "content"))
+                    recs = list(zip(cols["role"].tolist(), cols["content"]))
+                else:
+                    with open(p, "rb") as f:
+                        start = max(0, f.seek(0, 2) - budget); f.seek(start)
+                        lines = f.read().splitlines()[1 if start else 0:]     # drop the partial first line
+                    recs = []
+                    for line in lines:
+                        try: rec = json.loads(line); recs.append((rec.get("role"), rec.get("content", "")))
+                        except (ValueError, AttributeError): pass
+            except FileNotFoundError: continue
+            for role, content in reversed(recs):
+                if budget <= 0: break
+                budget -= len(content.encode("utf-8")) + 64   # ~ the JSONL line around it
+                if role in ("user", "assistant"): self.add(content, role)
+
+    def _read(self, path, size):
+        """Index complete lines of path between self.offset and size; advances self.offset."""
+        with open(path, "rb") as f:
+            f.seek(max(0, self.offset - 1))
+            if self.offset and f.read(1) != b"\n": f.readline()   # started mid-line
+            data = f.read(size - f.tell())
+        end = data.rfind(b"\n") + 1                 # leave a half-written last line for next time
+        for line in data[:end].splitlines():
+            try: rec = json.loads(line)
+            except ValueError: continue
+            if rec.get("role") in ("user", "assistant"): self.add(rec.get("content", ""), rec["role"])
+        self.offset = size - len(data) + end
+
+    def search(self, query, k=3, budget_ms=10.0, exclude=(), facts=None):
+        """Top-k (score, kind, text). Rarest query terms are scored first and
+        scoring stops at the deadline; facts not in `facts` (if given) are skipped."""
+        deadline = time.perf_counter() + budget_ms / 1000
+        with self._lock:
+            n = len(self.docs)
+            if not n: return []
+            avg = self.total / n
+            q = sorted(set(terms(query)), key=lambda t: len(self.postings.get(t, ())))
+            scores = defaultdict(float)
+            for t in q:
+                plist = self.postings.get(t)
+                if not plist: continue
+                idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+                for i, (doc, tf) in enumerate(plist):
+                    scores[doc] += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * self.lens[doc] / avg))
+                    if i & 1023 == 1023 and time.perf_counter() > deadline: break
+                if time.perf_counter() > deadline: break
+            exclude, facts = set(exclude), (set(facts) if facts is not None else None)
+            out = []
+            for doc, s in heapq.nlargest(4 * k + len(exclude), scores.items(), key=lambda x: x[1]):
+                kind, text = self.docs[doc]
+                if text in exclude or (kind == "fact" and facts is not None and text not in facts): continue
+                out.append((s, kind, text))
+                if len(out) == k: break
+            return out
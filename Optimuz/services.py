@@ -0,0 +1,71 @@
+"""OPTIMUZ services - long-lived backends on one background event loop"""
+
+import random, asyncio, threading
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+def retryable(e):
+    """Timeouts, connection drops, rate limits and 5xx; never auth or bad-request errors."""
+    if isinstance(e, (asyncio.TimeoutError, ConnectionError)): return True
+    if getattr(e, "status_code", None) in RETRY_STATUS: return True
+    if type(e).__name__ in ("APIConnectionError", "APITimeoutError"): return True
+    return type(e).__module__.split(".")[0] in ("aiohttp", "edge_tts")
+
+class Services:
+    """Per-process STT/LLM/TTS backends with timeouts and retry/backoff.
+    All coroutines run on one persistent loop, so the backends' HTTP pools
+    stay warm across turns and Streamlit reruns."""
+
+    def __init__(self, stt, llm, tts, timeouts=None, retries=2, backoff=0.4):
+        self.stt, self.llm, self.tts = stt, llm, tts
+        self.timeouts = {"stt":30.0, "llm":30.0, "llm_token":15.0, "tts":20.0, **(timeouts or {})}
+        self.retries, self.backoff = retries, backoff
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="optimuz-loop", daemon=True).start()
+
+    def run(self, coro):
+        """Run a coroutine on the service loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def submit(self, coro):
+        """Start a coroutine on the service loop without waiting; returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def warm(self, timeout=5.0):
+        """Let backends open connections before the next turn needs them.
+        Best effort: failures are ignored, the real call still retries."""
+        warmers = [b.warm() for b in (self.stt, self.llm, self.tts) if hasattr(b, "warm")]
+        try: await asyncio.wait_for(asyncio.gather(*warmers, return_exceptions=True), timeout)
+        except asyncio.TimeoutError: pass
+
+    async def _sleep(self, attempt):
+        await asyncio.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.0))
+
+    async def _call(self, stage, make):
+        for attempt in range(self.retries + 1):
+            try: return await asyncio.wait_for(make(), self.timeouts[stage])
+            except Exception as e:
+                if attempt == self.retries or not retryable(e): raise
+            await self._sleep(attempt)
+
+    async def transcribe(self, audio_bytes): return await self._call("stt", lambda: self.stt.transcribe(audio_bytes))
+
+    async def chat(self, msgs): return await self._call("llm", lambda: self.llm.complete(msgs))
+
+    async def synthesize(self, text): return await self._call("tts", lambda: self.tts.synthesize(text))
+
+    async def stream(self, msgs):
+        """LLM token stream; retried only if it fails before the first token."""
+        for attempt in range(self.retries + 1):
+            tokens, started = self.llm.stream(msgs), False
+            try:
+                while True:
+                    try: tok = await asyncio.wait_for(tokens.__anext__(), self.timeouts["llm_token"])
+                    except StopAsyncIteration: return
+                    started = True
+                    yield tok
+            except Exception as e:
+                if started or attempt == self.retries or not retryable(e): raise
+            finally:
+                await tokens.aclose()
+            await self._sleep(attempt)
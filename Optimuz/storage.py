@@ -0,0 +1,271 @@
+"""OPTIMUZ storage - JSONL history with tail-seeking reads, write-behind memory.json, per-user directories"""
+
+import os, re, copy, json, atexit, shutil, hashlib, tempfile, threading, weakref
+from pathlib import Path
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+try: import fcntl
+except ImportError: fcntl = None                 # Windows
+try: import msvcrt
+except ImportError: msvcrt = None
+
+CHUNK = 8192
+_USER_ID = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+def user_dir(root, user):
+    """root/users/<shard>/<user>. The shard is 2 hex chars of the id's hash, so
+    no directory holds more than ~1/256 of the users; ids that aren't plain
+    slugs are replaced by their hash."""
+    key = user if _USER_ID.fullmatch(user) else hashlib.sha1(user.encode("utf-8")).hexdigest()
+    return Path(root) / "users" / hashlib.sha1(key.encode("utf-8")).hexdigest()[:2] / key
+
+def seed_user_dir(root, user, names=("memory.json", "history.jsonl")):
+    """Copy the single-user files from root (the layout before per-user
+    directories) into user's directory, once: only if that directory doesn't
+    exist yet. Built in a temp dir and renamed, so a crash never leaves half a seed."""
+    dest = user_dir(root, user)
+    found = [Path(root) / n for n in names if (Path(root) / n).is_file()]
+    if dest.exists() or not found: return False
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=dest.parent, prefix=".seed-"))
+    for f in found: shutil.copy2(f, tmp / f.name)
+    try: os.rename(tmp, dest)
+    except OSError: shutil.rmtree(tmp, ignore_errors=True); return False   # another process seeded it first
+    return True
+
+def atomic_write(path, data):
+    """Write bytes to a temp file in the same directory, then rename over path."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f: f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp); raise
+
+@contextmanager
+def file_lock(path):
+    """Exclusive inter-process lock on a sidecar file (flock, or msvcrt on Windows)."""
+    with open(path, "a+b") as f:
+        if fcntl: fcntl.flock(f, fcntl.LOCK_EX)
+        elif msvcrt: f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try: yield
+        finally:
+            if fcntl: fcntl.flock(f, fcntl.LOCK_UN)
+            elif msvcrt: f.seek(0); msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def tail_lines(path, n, chunk=CHUNK):
+    """Return the last n non-empty lines of path, reading backwards from EOF.
+    Cost depends on the bytes in those n lines, not on the file size."""
+    if n <= 0: return []
+    try: f = open(path, "rb")
+    except FileNotFoundError: return []
+    with f:
+        pos = f.seek(0, os.SEEK_END)
+        buf, lines = b"", []
+        while pos > 0 and len(lines) <= n:
+            step = min(chunk, pos); pos -= step
+            f.seek(pos)
+            parts = (f.read(step) + buf).split(b"\n")
+            buf = parts[0]                       # may be a partial line, completed by the next chunk
+            lines = [p for p in parts[1:] if p.strip()] + lines
+        if pos == 0 and buf.strip(): lines = [buf] + lines
+    return [l.decode("utf-8") for l in lines[-n:]]
+
+
+class HistoryStore:
+    """history.jsonl: one {"ts","role","content","emotion"} object per line.
+
+    The active file is renamed to history-<time>.jsonl once it passes
+    segment_bytes or its first record is segment_days old. Closed segments,
+    except the newest (which recent() and the recall index still read),
+    are compacted on a background thread into history-<time>.npz column
+    archives; archives older than keep_days (0 = never) are deleted.
+    scan() and batches() stream over all of it, oldest first."""
+
+    def __init__(self, path, segment_bytes=4 << 20, segment_days=7, keep_days=0):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.segment_bytes, self.segment_days, self.keep_days = segment_bytes, segment_days, keep_days
+        self._first = (None, None)                 # (inode, ts of first record) of the active file
+        self._compacting = threading.Lock()
+        if len(self.segments(".jsonl")) > 1:         # left over from a process that exited mid-way
+            threading.Thread(target=self.compact, name="optimuz-compact", daemon=True).start()
+
+    def append(self, role, content, emotion="neutral"):
+        now = datetime.now()
+        self._maybe_rotate(now)
+        rec = {"ts":now.isoformat(),"role":role,"content":content,"emotion":emotion}
+        with open(self.path,"a",encoding="utf-8") as f:
+            f.write(json.dumps(rec,ensure_ascii=False)+"\n")
+        return rec
+
+    def recent(self, n=16):
+        lines = tail_lines(self.path, n)
+        if len(lines) < n and (segs := self.segments(".jsonl")):   # just rotated: top up from the last segment
+            lines = tail_lines(segs[-1], n - len(lines)) + lines
+        out = []
+        for l in lines:
+            try: out.append(json.loads(l))
+            except ValueError: pass                # torn write from a crashed process
+        return out
+
+    def clear(self):
+        with file_lock(self.lock_path):
+            for p in [*self.segments(), self.path]:
+                try: p.unlink()
+                except FileNotFoundError: pass
+
+    # ── rotation / compaction ────────────────────────────────────────────────
+    def segments(self, *suffixes):
+        """Closed segments and archives, oldest first (names sort by rotation time)."""
+        suffixes = suffixes or (".jsonl", ".npz")
+        return sorted(p for p in self.path.parent.glob(f"{self.path.stem}-*") if p.suffix in suffixes)
+
+    def usage(self):
+        """(closed segments, bytes on disk including the active file)."""
+        segs, total = self.segments(), 0
+        for p in [*segs, self.path]:
+            try: total += p.stat().st_size
+            except FileNotFoundError: pass
+        return len(segs), total
+
+    def _started(self, ino):
+        if self._first[0] != ino:
+            with open(self.path, "rb") as f: line = f.readline()
+            try: rec = json.loads(line); ts = datetime.fromisoformat(rec.get("ts") or rec["timestamp"])
+            except (ValueError, KeyError, TypeError, AttributeError): ts = None
+            self._first = (ino, ts)
+        return self._first[1]
+
+    def _due(self, now):
+        try: st = self.path.stat()
+        except FileNotFoundError: return False
+        if st.st_size >= self.segment_bytes: return True
+        started = self.segment_days > 0 and self._started(st.st_ino)
+        return bool(started) and (now - started).total_seconds() >= self.segment_days * 86400
+
+    def _maybe_rotate(self, now):
+        if not self._due(now): return
+        with file_lock(self.lock_path):
+            if not self._due(now): return          # another process rotated first
+            os.replace(self.path, self.path.with_name(f"{self.path.stem}-{now:%Y%m%dT%H%M%S%f}{self.path.suffix}"))
+        threading.Thread(target=self.compact, name="optimuz-compact", daemon=True).start()
+
+    def compact(self):
+        """Archive every closed JSONL segment but the newest; apply keep_days."""
+        if not self._compacting.acquire(blocking=False): return
+        try:
+            from archive import compact
+            with file_lock(self.lock_path):
+                for seg in self.segments(".jsonl")[:-1]:
+                    compact(seg, seg.with_suffix(".npz")); seg.unlink()
+                if self.keep_days > 0:
+                    cutoff = f"{self.path.stem}-{datetime.now() - timedelta(days=self.keep_days):%Y%m%dT%H%M%S%f}"
+                    for p in self.segments(".npz"):
+                        if p.stem < cutoff: p.unlink()
+        finally: self._compacting.release()
+
+    # ── analytics ────────────────────────────────────────────────────────────
+    def _parts(self, since):
+        """Segment/archive paths that can hold records at or after since, then the active file."""
+        floor = f"{self.path.stem}-{since:%Y%m%dT%H%M%S%f}" if since else ""
+        return [p for p in self.segments() if p.stem >= floor] + [self.path]   # a segment's name is its end time
+
+    def batches(self, fields=("ts","role","emotion"), since=None, until=None):
+        """One {field: column} dict per segment, oldest first; see archive.to_columns.
+        Archives only decompress the requested columns."""
+        import numpy as np
+        from archive import read_jsonl, read_archive, to_columns, select
+        need = tuple(fields) + (("ts",) if (since or until) and "ts" not in fields else ())
+        for p in self._parts(since):
+            try: cols = read_archive(p, need) if p.suffix == ".npz" else to_columns(list(read_jsonl(p)), need)
+            except FileNotFoundError:               # compacted while we were reading
+                if p.suffix != ".jsonl" or not p.with_suffix(".npz").exists(): continue
+                cols = read_archive(p.with_suffix(".npz"), need)
+            if since or until:
+                ts, mask = cols["ts"], np.ones(len(cols["ts"]), bool)
+                if since: mask &= ts >= np.datetime64(since, "us")
+                if until: mask &= ts < np.datetime64(until, "us")
+                cols = select(cols, mask)
+            if cols and len(next(iter(cols.values()))): yield {f: cols[f] for f in fields}
+
+    def scan(self, since=None, until=None):
+        """Every record as a dict, oldest first, streamed segment by segment."""
+        for cols in self.batches(("ts","role","emotion","content"), since, until):
+            for ts, role, emotion, content in zip(cols["ts"].astype(str), cols["role"], cols["emotion"], cols["content"]):
+                yield {"ts":None if ts == "NaT" else ts, "role":str(role), "content":content, "emotion":str(emotion)}
+
+
+_OPEN_STORES = weakref.WeakSet()                 # flushed at exit; closed stores drop out
+
+@atexit.register
+def _flush_all():
+    for store in list(_OPEN_STORES): store.flush()
+
+def empty_memory(): return {"facts":[],"name":None,"last_seen":None,"mood_history":[]}
+
+class MemoryStore:
+    """memory.json behind a cached parsed copy.
+
+    Changes are functions applied to the cached copy at once and queued;
+    a timer flushes them after flush_delay seconds. A flush takes the file
+    lock, re-reads the file if another process changed it, replays the
+    queued changes on top and renames the result into place, so concurrent
+    workers don't lose each other's writes. Reads only hit the disk when
+    the file's mtime/size change."""
+
+    def __init__(self, path, flush_delay=1.0):
+        self.path, self.flush_delay = Path(path), flush_delay
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self._lock = threading.RLock()
+        self._pending, self._timer, self._sig = [], None, None
+        self._data = empty_memory()
+        _OPEN_STORES.add(self)
+
+    def _stat(self):
+        try: st = self.path.stat(); return st.st_mtime_ns, st.st_size, st.st_ino
+        except FileNotFoundError: return None
+
+    def _refresh(self):
+        sig = self._stat()
+        if sig == self._sig: return
+        data = empty_memory()
+        if sig:
+            try: data = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError: pass
+        for fn in self._pending: fn(data)
+        self._data, self._sig = data, sig
+
+    def get(self):
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._data)
+
+    def update(self, fn):
+        """Apply fn(memory) now and persist it with the next flush; returns the new memory."""
+        with self._lock:
+            self._refresh()
+            fn(self._data)
+            self._pending.append(fn)
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return copy.deepcopy(self._data)
+
+    def replace(self, m):
+        def fn(data): data.clear(); data.update(copy.deepcopy(m))
+        return self.update(fn)
+
+    def flush(self):
+        with self._lock:
+            if self._timer: self._timer.cancel(); self._timer = None
+            if not self._pending: return
+            with file_lock(self.lock_path):
+                self._refresh()                  # picks up other writers, replays ours
+                atomic_write(self.path, json.dumps(self._data, indent=2, ensure_ascii=False).encode("utf-8"))
+                self._sig, self._pending = self._stat(), []
+
+    def close(self):
+        self.flush(); _OPEN_STORES.discard(self)
@@ -0,0 +1,94 @@
+"""OPTIMUZ tracing - per-stage turn timings to a rolling JSONL log and a Prometheus text file"""
+
+import os, json, time, uuid, threading
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from collections import defaultdict, deque
+from storage import tail_lines, atomic_write
+
+STAGES = ["vad","stt","analyze","memory","prompt","llm","tts","reply","render","turn"]   # reply = streamed llm+tts
+
+def percentile(sorted_values, q):
+    if not sorted_values: return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+class Tracer:
+    """One Tracer per process. A turn belongs to the script thread that began
+    it; stage() outside a turn is a no-op, so helpers can always be wrapped.
+
+    Finished turns are appended to metrics.jsonl (rolled over to .1 past
+    max_bytes) and the last `window` timings per stage feed p50/p95 and the
+    Prometheus summary in metrics.prom."""
+
+    def __init__(self, path, prom_path=None, window=500, max_bytes=5 << 20):
+        self.path = Path(path)
+        self.prom_path = Path(prom_path) if prom_path else self.path.with_suffix(".prom")
+        self.window, self.max_bytes = window, max_bytes
+        self._lock, self._local = threading.Lock(), threading.local()
+        self.samples = defaultdict(lambda: deque(maxlen=window))   # stage -> ms
+        self.counts, self.sums, self.errors = defaultdict(int), defaultdict(float), defaultdict(int)
+        for line in tail_lines(self.path, window):                 # warm up from the last run
+            try: self._observe(json.loads(line))
+            except (ValueError, KeyError): pass
+
+    @property
+    def current(self): return getattr(self._local, "turn", None)
+
+    def begin(self, **attrs):
+        self._local.turn = {"turn":uuid.uuid4().hex[:8], "ts":datetime.now().isoformat(),
+                            "t0":time.perf_counter(), "stages":[], **attrs}
+        return self._local.turn
+
+    @contextmanager
+    def stage(self, name, **attrs):
+        """Time a block; the yielded dict takes payload sizes (bytes_in, tokens, ...).
+        An exception is recorded on the stage and re-raised."""
+        rec = {"stage":name, **attrs}
+        turn, t0 = self.current, time.perf_counter()
+        try: yield rec
+        except Exception as e:
+            rec["error"] = f"{type(e).__name__}: {e}"[:200]; raise
+        finally:
+            rec["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+            if turn is not None: turn["stages"].append(rec)
+
+    def end(self, outcome="ok"):
+        turn, self._local.turn = self.current, None
+        if turn is None: return
+        turn["outcome"] = outcome
+        turn["stages"].append({"stage":"turn", "ms":round((time.perf_counter() - turn.pop("t0")) * 1000, 2)})
+        line = json.dumps(turn, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._observe(turn)
+            try:
+                if self.path.stat().st_size > self.max_bytes: os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+            except FileNotFoundError: pass
+            with open(self.path, "a", encoding="utf-8") as f: f.write(line)
+            atomic_write(self.prom_path, self.prometheus().encode("utf-8"))
+        return turn
+
+    def _observe(self, turn):
+        for s in turn["stages"]:
+            self.samples[s["stage"]].append(s["ms"])
+            self.counts[s["stage"]] += 1; self.sums[s["stage"]] += s["ms"]
+            if "error" in s: self.errors[s["stage"]] += 1
+
+    def summary(self):
+        """{stage: {"p50", "p95", "n", "errors"}} over the rolling window, in pipeline order."""
+        out = {}
+        for name in sorted(self.samples, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+            v = sorted(self.samples[name])
+            out[name] = {"p50":percentile(v, .5), "p95":percentile(v, .95), "n":len(v), "errors":self.errors[name]}
+        return out
+
+    def prometheus(self):
+        lines = ["# HELP optimuz_stage_seconds Wall time per turn stage.", "# TYPE optimuz_stage_seconds summary"]
+        for name, s in self.summary().items():
+            for q, key in (("0.5", "p50"), ("0.95", "p95")):
+                lines.append(f'optimuz_stage_seconds{{stage="{name}",quantile="{q}"}} {s[key] / 1000:.6f}')
+            lines.append(f'optimuz_stage_seconds_sum{{stage="{name}"}} {self.sums[name] / 1000:.6f}')
+            lines.append(f'optimuz_stage_seconds_count{{stage="{name}"}} {self.counts[name]}')
+        lines += ["# HELP optimuz_stage_errors_total Failed stage runs.", "# TYPE optimuz_stage_errors_total counter"]
+        lines += [f'optimuz_stage_errors_total{{stage="{n}"}} {c}' for n, c in self.errors.items()]
+        return "\n".join(lines) + "\n"